@@ -8,6 +8,7 @@ from routes.monitor_routes import monitor_bp
 from routes.ntp_monitor_routes import ntp_bp
 from routes.ntp_history_routes import ntp_history_bp  # 新增：导入NTP历史查询路由
 import config
+from utils.json_provider import install_json_provider
 
 # 新增：导入数据库和数据接收服务相关模块
 from models import ntp_models
@@ -103,6 +104,8 @@ def get_ingestion_service_instance():
 def create_app():
     """Create and configure the Flask application"""
     app = Flask(__name__)
+    # orjson已安装时用其序列化JSON响应
+    install_json_provider(app)
 
     # 新增：初始化数据库
     logger.info("开始初始化应用组件...")
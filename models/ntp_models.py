@@ -8,9 +8,70 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from typing import Dict, Any, Optional
 from datetime import datetime
+from operator import itemgetter
+import calendar
 
 Base = declarative_base()
 
+# 客户端已存在时，由新会话数据覆盖的字段（与update_from_session_data保持一致）
+SESSION_UPDATE_COLUMNS = (
+    'ntp_version', 'stratum', 'precision', 'root_delay', 'root_dispersion',
+    'reference_id', 'leap_indicator', 'poll_interval',
+    'reference_timestamp', 'originate_timestamp', 'receive_timestamp', 'transmit_timestamp',
+    'client_to_server_latency_seconds', 'server_processing_time_seconds', 'total_process_time_seconds',
+    'packet_length', 'session_timestamp', 'last_seen_timestamp', 'last_seen_epoch'
+)
+
+# 新记录直接取自会话数据的字段及其缺省值（会话数据中缺少该字段时使用）
+_SESSION_ROW_DEFAULTS = {
+    'client_ip': '', 'client_port': 0, 'server_ip': '', 'server_port': 123, 'interface_name': '',
+    'ntp_version': 0, 'stratum': None, 'precision': None, 'root_delay': None, 'root_dispersion': None,
+    'reference_id': None, 'leap_indicator': None, 'poll_interval': None,
+    'reference_timestamp': None, 'originate_timestamp': None, 'receive_timestamp': None, 'transmit_timestamp': None,
+    'client_to_server_latency_seconds': None, 'server_processing_time_seconds': None,
+    'total_process_time_seconds': None, 'packet_length': None
+}
+_SESSION_ROW_COLUMNS = tuple(_SESSION_ROW_DEFAULTS)
+_session_row_getter = itemgetter(*_SESSION_ROW_COLUMNS)
+
+# row_from_session_data 返回的全部列（批量写入语句的参数列）
+SESSION_ROW_COLUMNS = _SESSION_ROW_COLUMNS + (
+    'session_timestamp', 'first_seen_timestamp', 'last_seen_timestamp', 'last_seen_epoch', 'session_count'
+)
+
+
+def _parse_session_timestamp(session_data: Dict[str, Any]) -> datetime:
+    """
+    解析会话数据中的时间戳，缺失或格式错误时使用当前UTC时间
+
+    Args:
+        session_data: 从ntp_worker.py接收的会话数据
+
+    Returns:
+        datetime: 会话时间戳
+    """
+    if session_data.get('session_timestamp'):
+        try:
+            return datetime.fromisoformat(
+                session_data['session_timestamp'].replace('Z', '+00:00')
+            )
+        except (ValueError, AttributeError):
+            pass
+    return datetime.utcnow()
+
+
+def to_epoch_seconds(value: datetime) -> int:
+    """
+    将时间转换为Unix时间戳（秒），不带时区的时间按UTC处理（与数据库中存储的时间一致）
+
+    Args:
+        value: 时间
+
+    Returns:
+        int: Unix时间戳（秒）
+    """
+    return calendar.timegm(value.utctimetuple())
+
 
 class NTPClient(Base):
     """
@@ -23,7 +84,7 @@ class NTPClient(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
 
     # 网络标识信息
-    client_ip = Column(String(45), nullable=False, index=True, comment="客户端IP地址，支持IPv4和IPv6")
+    client_ip = Column(String(45), nullable=False, comment="客户端IP地址，支持IPv4和IPv6")
     client_port = Column(Integer, nullable=False, comment="客户端端口")
     server_ip = Column(String(45), nullable=False, comment="服务器IP地址")
     server_port = Column(Integer, nullable=False, default=123, comment="服务器端口，通常为123")
@@ -57,15 +118,18 @@ class NTPClient(Base):
     # 记录管理字段
     first_seen_timestamp = Column(DateTime, nullable=False, default=func.now(), comment="首次发现时间")
     last_seen_timestamp = Column(DateTime, nullable=False, default=func.now(), comment="最后发现时间")
+    # 旧数据库通过ALTER TABLE补充此列，因此允许为空
+    last_seen_epoch = Column(Integer, nullable=True, comment="最后发现时间（Unix时间戳，秒），用于排序和清理")
     session_count = Column(Integer, nullable=False, default=1, comment="会话总数")
     created_at = Column(DateTime, nullable=False, default=func.now(), comment="记录创建时间")
     updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now(), comment="记录更新时间")
 
     # 创建复合索引以优化查询性能
     __table_args__ = (
+        Index('uq_client_ip', 'client_ip', unique=True),  # 批量upsert的冲突目标
         Index('idx_client_interface', 'client_ip', 'interface_name'),
-        Index('idx_last_seen', 'last_seen_timestamp'),
-        Index('idx_interface_last_seen', 'interface_name', 'last_seen_timestamp'),
+        Index('idx_last_seen_epoch', 'last_seen_epoch'),
+        Index('idx_interface_last_seen_epoch', 'interface_name', 'last_seen_epoch'),  # 按网卡筛选的列表排序
         Index('idx_client_session_time', 'client_ip', 'session_timestamp'),
     )
 
@@ -127,6 +191,27 @@ class NTPClient(Base):
             'total_process_time_seconds': self.total_process_time_seconds
         }
 
+    @classmethod
+    def row_from_session_data(cls, session_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        从会话数据构建新记录的列值字典，用于Core批量插入
+
+        Args:
+            session_data: 从ntp_worker.py接收的会话数据
+
+        Returns:
+            Dict[str, Any]: 列名到列值的映射
+        """
+        row = dict(zip(_SESSION_ROW_COLUMNS, _session_row_getter({**_SESSION_ROW_DEFAULTS, **session_data})))
+
+        session_timestamp = _parse_session_timestamp(session_data)
+        row['session_timestamp'] = session_timestamp
+        row['first_seen_timestamp'] = session_timestamp
+        row['last_seen_timestamp'] = session_timestamp
+        row['last_seen_epoch'] = to_epoch_seconds(session_timestamp)
+        row['session_count'] = 1
+        return row
+
     @classmethod
     def from_session_data(cls, session_data: Dict[str, Any]) -> 'NTPClient':
         """
@@ -138,44 +223,7 @@ class NTPClient(Base):
         Returns:
             NTPClient: 新的NTPClient实例
         """
-        # 解析会话时间戳
-        session_timestamp = None
-        if session_data.get('session_timestamp'):
-            try:
-                session_timestamp = datetime.fromisoformat(
-                    session_data['session_timestamp'].replace('Z', '+00:00')
-                )
-            except (ValueError, AttributeError):
-                session_timestamp = datetime.utcnow()
-        else:
-            session_timestamp = datetime.utcnow()
-
-        return cls(
-            client_ip=session_data.get('client_ip', ''),
-            client_port=session_data.get('client_port', 0),
-            server_ip=session_data.get('server_ip', ''),
-            server_port=session_data.get('server_port', 123),
-            interface_name=session_data.get('interface_name', ''),
-            ntp_version=session_data.get('ntp_version', 0),
-            stratum=session_data.get('stratum'),
-            precision=session_data.get('precision'),
-            root_delay=session_data.get('root_delay'),
-            root_dispersion=session_data.get('root_dispersion'),
-            reference_id=session_data.get('reference_id'),
-            leap_indicator=session_data.get('leap_indicator'),
-            poll_interval=session_data.get('poll_interval'),
-            reference_timestamp=session_data.get('reference_timestamp'),
-            originate_timestamp=session_data.get('originate_timestamp'),
-            receive_timestamp=session_data.get('receive_timestamp'),
-            transmit_timestamp=session_data.get('transmit_timestamp'),
-            client_to_server_latency_seconds=session_data.get('client_to_server_latency_seconds'),
-            server_processing_time_seconds=session_data.get('server_processing_time_seconds'),
-            total_process_time_seconds=session_data.get('total_process_time_seconds'),
-            packet_length=session_data.get('packet_length'),
-            session_timestamp=session_timestamp,
-            first_seen_timestamp=session_timestamp,
-            last_seen_timestamp=session_timestamp
-        )
+        return cls(**cls.row_from_session_data(session_data))
 
     def update_from_session_data(self, session_data: Dict[str, Any]) -> None:
         """
@@ -185,16 +233,7 @@ class NTPClient(Base):
             session_data: 从ntp_worker.py接收的新会话数据
         """
         # 解析会话时间戳
-        session_timestamp = None
-        if session_data.get('session_timestamp'):
-            try:
-                session_timestamp = datetime.fromisoformat(
-                    session_data['session_timestamp'].replace('Z', '+00:00')
-                )
-            except (ValueError, AttributeError):
-                session_timestamp = datetime.utcnow()
-        else:
-            session_timestamp = datetime.utcnow()
+        session_timestamp = _parse_session_timestamp(session_data)
 
         # 更新最新的NTP协议信息
         self.ntp_version = session_data.get('ntp_version', self.ntp_version)
@@ -224,6 +263,7 @@ class NTPClient(Base):
         self.packet_length = session_data.get('packet_length', self.packet_length)
         self.session_timestamp = session_timestamp
         self.last_seen_timestamp = session_timestamp
+        self.last_seen_epoch = to_epoch_seconds(session_timestamp)
 
         # 增加会话计数
         self.session_count += 1
@@ -14,11 +14,13 @@ import json
 import time
 import os
 import logging
+import functools
 import socket
 import pickle
 from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional, Tuple
 import argparse
+from collections import OrderedDict, deque
 
 # 配置日志 - 修改：只使用stdout，由父进程重定向到日志文件
 logging.basicConfig(
@@ -31,13 +33,60 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# tcpdump输出解析用的正则表达式，模块加载时编译一次，逐行解析时直接使用
+_TIMESTAMP_RE = re.compile(r'(\d+:\d+:\d+\.\d+)')
+_CLIENT_RE = re.compile(r'(\d+\.\d+\.\d+\.\d+)\.(\d+) > (\d+\.\d+\.\d+\.\d+)\.123: NTPv(\d+), Client')
+_SERVER_RE = re.compile(r'(\d+\.\d+\.\d+\.\d+)\.123 > (\d+\.\d+\.\d+\.\d+)\.(\d+): NTPv(\d+), Server')
+_INET_RE = re.compile(r'inet\s+(\d+\.\d+\.\d+\.\d+)/(\d+)')
+_LENGTH_RE = re.compile(r'length (\d+)')
+_LEAP_RE = re.compile(r'Leap indicator: ([^,]+)')
+_LEAP_VALUE_RE = re.compile(r'\((\d+)\)')
+_STRATUM_RE = re.compile(r'Stratum (\d+) \(([^)]+)\)')
+_POLL_RE = re.compile(r'poll (\d+) \(([^)]+)\)')
+_PRECISION_RE = re.compile(r'precision (-?\d+)')
+_ROOT_RE = re.compile(r'Root Delay: ([0-9.]+), Root dispersion: ([0-9.]+)')
+_REFERENCE_ID_RE = re.compile(r'Reference-ID: ([A-Za-z0-9]+)')
+_NTP_TIMESTAMP_RES = (
+    ('reference_timestamp', re.compile(r'Reference Timestamp:\s+([0-9.]+)')),
+    ('originate_timestamp', re.compile(r'Originator Timestamp: ([0-9.]+)')),
+    ('receive_timestamp', re.compile(r'Receive Timestamp:\s+([0-9.]+)')),
+    ('transmit_timestamp', re.compile(r'Transmit Timestamp:\s+([0-9.]+)')),
+)
+
+# tcpdump内核捕获缓冲区大小（KiB，对应 -B 参数）：突发流量时由内核暂存数据包，
+# 避免解析跟不上时在内核中丢包
+TCPDUMP_BUFFER_KIB = 16384
+
+# NTP纪元（1900-01-01）与Unix纪元（1970-01-01）相差的秒数
+NTP_EPOCH_OFFSET = 2208988800
+
+# 可读时间的缓存条目数：服务器的参考时间戳在大量会话中重复出现，
+# 同一会话中请求的发送时间戳与响应的发起时间戳也相同
+NTP_TIMESTAMP_CACHE_SIZE = 2048
+
+# 内存中保留的未匹配数据包条数上限，超出后丢弃最早的记录（长期运行时内存不再持续增长）
+MAX_UNMATCHED_PACKETS = 10000
+
+
+@functools.lru_cache(maxsize=NTP_TIMESTAMP_CACHE_SIZE)
+def _format_ntp_timestamp(ntp_timestamp: float) -> str:
+    """将NTP时间戳转换为可读时间，结果按时间戳缓存"""
+    if ntp_timestamp == 0:
+        return "未设置"
+    try:
+        unix_timestamp = ntp_timestamp - NTP_EPOCH_OFFSET
+        dt = datetime.fromtimestamp(unix_timestamp, tz=timezone.utc)
+        return dt.strftime('%Y-%m-%d %H:%M:%S.%f UTC')[:-3]
+    except (ValueError, OSError):
+        return f"解析错误: {ntp_timestamp}"
+
 
 class SingleInterfaceNTPAnalyzer:
     """单网卡NTP分析器 - 专注于单个网卡的监控，通过TCP发送数据"""
 
     def __init__(self, interface: str, port: int = 123, output_file: Optional[str] = None,
                  pairing_timeout: float = 2.0, ingestion_host: str = '127.0.0.1',
-                 ingestion_port: int = 10000):
+                 ingestion_port: int = 10000, max_unmatched_packets: int = MAX_UNMATCHED_PACKETS):
         """
         初始化NTP分析器
 
@@ -48,6 +97,7 @@ class SingleInterfaceNTPAnalyzer:
             pairing_timeout: 配对超时时间
             ingestion_host: 数据接收服务主机
             ingestion_port: 数据接收服务端口
+            max_unmatched_packets: 内存中保留的未匹配数据包条数上限
         """
         self.interface = interface
         self.port = port
@@ -61,8 +111,11 @@ class SingleInterfaceNTPAnalyzer:
         self.sent_sessions_count = 0  # 新增：成功发送的会话计数
 
         # 存储待配对的请求和响应
-        self.pending_requests = {}
-        self.unmatched_packets = []
+        # key -> (到达时的单调时钟, request_data)，按到达时间排序（最早的在前），清理超时请求时只需检查队首
+        self.pending_requests = OrderedDict()
+        # 只保留最近的max_unmatched_packets条未匹配数据包，unmatched_count为累计总数
+        self.unmatched_packets = deque(maxlen=max_unmatched_packets)
+        self.unmatched_count = 0
 
         # TCP连接管理
         self.tcp_socket = None
@@ -241,7 +294,7 @@ class SingleInterfaceNTPAnalyzer:
         for line in ip_output.split('\n'):
             # 解析IP地址
             if 'inet ' in line:
-                ip_match = re.search(r'inet\s+(\d+\.\d+\.\d+\.\d+)/(\d+)', line)
+                ip_match = _INET_RE.search(line)
                 if ip_match:
                     ip_addr = ip_match.group(1)
                     prefix = ip_match.group(2)
@@ -282,14 +335,13 @@ class SingleInterfaceNTPAnalyzer:
             line = line.strip()
 
             # 解析时间戳
-            timestamp_match = re.match(r'(\d+:\d+:\d+\.\d+)', line)
+            timestamp_match = _TIMESTAMP_RE.match(line)
             if timestamp_match:
                 packet_info['timestamp'] = timestamp_match.group(1)
                 packet_info['capture_time'] = time.time()
 
             # 解析客户端请求
-            client_match = re.search(r'(\d+\.\d+\.\d+\.\d+)\.(\d+) > (\d+\.\d+\.\d+\.\d+)\.123: NTPv(\d+), Client',
-                                     line)
+            client_match = _CLIENT_RE.search(line)
             if client_match:
                 packet_info.update({
                     'src_ip': client_match.group(1),
@@ -301,8 +353,7 @@ class SingleInterfaceNTPAnalyzer:
                 })
 
             # 解析服务器响应
-            server_match = re.search(r'(\d+\.\d+\.\d+\.\d+)\.123 > (\d+\.\d+\.\d+\.\d+)\.(\d+): NTPv(\d+), Server',
-                                     line)
+            server_match = _SERVER_RE.search(line)
             if server_match:
                 packet_info.update({
                     'src_ip': server_match.group(1),
@@ -321,21 +372,21 @@ class SingleInterfaceNTPAnalyzer:
     def parse_ntp_fields(self, line: str, ntp_info: Dict[str, Any]) -> None:
         """解析NTP协议字段"""
         # 数据长度
-        length_match = re.search(r'length (\d+)', line)
+        length_match = _LENGTH_RE.search(line)
         if length_match:
             ntp_info['length'] = int(length_match.group(1))
 
         # 闰秒指示器
-        leap_match = re.search(r'Leap indicator: ([^,]+)', line)
+        leap_match = _LEAP_RE.search(line)
         if leap_match:
             leap_text = leap_match.group(1).strip()
             ntp_info['leap_indicator'] = leap_text
-            leap_num_match = re.search(r'\((\d+)\)', leap_text)
+            leap_num_match = _LEAP_VALUE_RE.search(leap_text)
             if leap_num_match:
                 ntp_info['leap_value'] = int(leap_num_match.group(1))
 
         # 层级
-        stratum_match = re.search(r'Stratum (\d+) \(([^)]+)\)', line)
+        stratum_match = _STRATUM_RE.search(line)
         if stratum_match:
             ntp_info.update({
                 'stratum': int(stratum_match.group(1)),
@@ -343,7 +394,7 @@ class SingleInterfaceNTPAnalyzer:
             })
 
         # 轮询间隔
-        poll_match = re.search(r'poll (\d+) \(([^)]+)\)', line)
+        poll_match = _POLL_RE.search(line)
         if poll_match:
             ntp_info.update({
                 'poll': int(poll_match.group(1)),
@@ -351,12 +402,12 @@ class SingleInterfaceNTPAnalyzer:
             })
 
         # 精度
-        precision_match = re.search(r'precision (-?\d+)', line)
+        precision_match = _PRECISION_RE.search(line)
         if precision_match:
             ntp_info['precision'] = int(precision_match.group(1))
 
         # 根延迟和根离散
-        root_match = re.search(r'Root Delay: ([0-9.]+), Root dispersion: ([0-9.]+)', line)
+        root_match = _ROOT_RE.search(line)
         if root_match:
             ntp_info.update({
                 'root_delay': float(root_match.group(1)),
@@ -364,22 +415,15 @@ class SingleInterfaceNTPAnalyzer:
             })
 
         # 参考ID
-        ref_id_match = re.search(r'Reference-ID: ([A-Za-z0-9]+)', line)
+        ref_id_match = _REFERENCE_ID_RE.search(line)
         if ref_id_match:
             ntp_info['reference_id'] = ref_id_match.group(1)
 
         # 时间戳
-        timestamps = {
-            'reference': r'Reference Timestamp:\s+([0-9.]+)',
-            'originate': r'Originator Timestamp: ([0-9.]+)',
-            'receive': r'Receive Timestamp:\s+([0-9.]+)',
-            'transmit': r'Transmit Timestamp:\s+([0-9.]+)'
-        }
-
-        for ts_name, pattern in timestamps.items():
-            ts_match = re.search(pattern, line)
+        for ts_key, pattern in _NTP_TIMESTAMP_RES:
+            ts_match = pattern.search(line)
             if ts_match:
-                ntp_info[f'{ts_name}_timestamp'] = float(ts_match.group(1))
+                ntp_info[ts_key] = float(ts_match.group(1))
 
     def get_session_key(self, packet_info: Dict[str, Any]) -> Tuple[str, int, str]:
         """生成会话键"""
@@ -391,19 +435,23 @@ class SingleInterfaceNTPAnalyzer:
     def try_pair_packet(self, packet_info: Dict[str, Any], ntp_info: Dict[str, Any]) -> None:
         """尝试配对数据包"""
         session_key = self.get_session_key(packet_info)
+        # 复用解析数据包时记录的捕获时间，不再为每个数据包重复读取系统时钟
+        capture_time = packet_info.get('capture_time') or time.time()
 
         if packet_info['packet_type'] == 'request':
             # 存储请求，等待响应
-            self.pending_requests[session_key] = {
+            self.pending_requests[session_key] = (time.monotonic(), {
                 'packet_info': packet_info,
                 'ntp_info': ntp_info,
-                'timestamp': time.time()
-            }
+                'timestamp': capture_time
+            })
+            # 同一会话重发的请求移到末尾，保持按时间排序
+            self.pending_requests.move_to_end(session_key)
 
         elif packet_info['packet_type'] == 'response':
             # 查找对应的请求
             if session_key in self.pending_requests:
-                request_data = self.pending_requests.pop(session_key)
+                _, request_data = self.pending_requests.pop(session_key)
 
                 # 创建完整的会话记录
                 session = {
@@ -413,7 +461,7 @@ class SingleInterfaceNTPAnalyzer:
                     'response': {
                         'packet_info': packet_info,
                         'ntp_info': ntp_info,
-                        'timestamp': time.time()
+                        'timestamp': capture_time
                     }
                 }
 
@@ -426,6 +474,7 @@ class SingleInterfaceNTPAnalyzer:
 
             else:
                 # 没有找到对应的请求，记录为未匹配
+                self.unmatched_count += 1
                 self.unmatched_packets.append({
                     'type': 'orphaned_response',
                     'packet_info': packet_info,
@@ -577,31 +626,27 @@ class SingleInterfaceNTPAnalyzer:
 
     def ntp_timestamp_to_datetime(self, ntp_timestamp: float) -> str:
         """将NTP时间戳转换为可读时间"""
-        if ntp_timestamp == 0:
-            return "未设置"
-        try:
-            unix_timestamp = ntp_timestamp - 2208988800
-            dt = datetime.fromtimestamp(unix_timestamp, tz=timezone.utc)
-            return dt.strftime('%Y-%m-%d %H:%M:%S.%f UTC')[:-3]
-        except (ValueError, OSError):
-            return f"解析错误: {ntp_timestamp}"
+        return _format_ntp_timestamp(ntp_timestamp)
 
     def cleanup_old_requests(self) -> None:
         """清理超时的请求"""
-        current_time = time.time()
-        expired_keys = []
-
-        for key, request_data in self.pending_requests.items():
-            if current_time - request_data['timestamp'] > self.pairing_timeout:
-                expired_keys.append(key)
-                self.unmatched_packets.append({
-                    'type': 'orphaned_request',
-                    'packet_info': request_data['packet_info'],
-                    'ntp_info': request_data['ntp_info']
-                })
-
-        for key in expired_keys:
-            del self.pending_requests[key]
+        current_time = time.monotonic()
+        pending_requests = self.pending_requests
+
+        # 请求按到达时间排序，从最早的开始清理，遇到未超时的请求即可停止；
+        # 到达时间取单调时钟，系统时间被向回调整时队首请求也不会阻塞后面请求的清理
+        while pending_requests:
+            received_at, request_data = next(iter(pending_requests.values()))
+            if current_time - received_at <= self.pairing_timeout:
+                break
+
+            pending_requests.popitem(last=False)
+            self.unmatched_count += 1
+            self.unmatched_packets.append({
+                'type': 'orphaned_request',
+                'packet_info': request_data['packet_info'],
+                'ntp_info': request_data['ntp_info']
+            })
 
     def process_packet_block(self, lines: List[str]) -> None:
         """处理数据包块"""
@@ -619,7 +664,8 @@ class SingleInterfaceNTPAnalyzer:
 
     def run_capture(self) -> None:
         """运行捕获"""
-        cmd = ['tcpdump', '-i', self.interface, '-n', '-v', '-l', f'udp port {self.port}']
+        cmd = ['tcpdump', '-i', self.interface, '-B', str(TCPDUMP_BUFFER_KIB), '-n', '-v', '-l',
+               f'udp port {self.port}']
 
         try:
             process = subprocess.Popen(
@@ -629,8 +675,13 @@ class SingleInterfaceNTPAnalyzer:
 
             current_block = []
 
+            # 逐行循环中使用的方法预先绑定为局部变量，避免每行重复查找属性
+            readline = process.stdout.readline
+            process_packet_block = self.process_packet_block
+            match_packet_start = _TIMESTAMP_RE.match
+
             while self.running:
-                line = process.stdout.readline()
+                line = readline()
                 if not line:
                     break
 
@@ -639,16 +690,16 @@ class SingleInterfaceNTPAnalyzer:
                     continue
 
                 # 检测新数据包开始
-                if re.match(r'\d+:\d+:\d+\.\d+', line):
+                if match_packet_start(line):
                     if current_block:
-                        self.process_packet_block(current_block)
+                        process_packet_block(current_block)
                     current_block = [line]
                     self.packet_count += 1
                 elif current_block:
                     current_block.append(line)
 
             if current_block:
-                self.process_packet_block(current_block)
+                process_packet_block(current_block)
 
         except Exception as e:
             logger.error(f"捕获出错: {e}")
@@ -669,12 +720,12 @@ class SingleInterfaceNTPAnalyzer:
                         'completed_sessions': self.session_count,
                         'sent_sessions': self.sent_sessions_count,  # 新增：发送成功的会话数
                         'pending_requests': len(self.pending_requests),
-                        'unmatched_packets': len(self.unmatched_packets),
+                        'unmatched_packets': self.unmatched_count,
                         'capture_time': datetime.now().isoformat(),
                         'tcp_connection_status': self.tcp_connected
                     },
                     'interface_info': self.interface_info,
-                    'unmatched_packets': self.unmatched_packets  # 仅包含未匹配的包
+                    'unmatched_packets': list(self.unmatched_packets)  # 仅包含最近的未匹配数据包
                 }
 
                 with open(self.output_file, 'w', encoding='utf-8') as f:
@@ -713,7 +764,7 @@ class SingleInterfaceNTPAnalyzer:
             logger.info(f"  完整会话: {self.session_count}")
             logger.info(f"  发送成功会话: {self.sent_sessions_count}")
             logger.info(f"  待配对请求: {len(self.pending_requests)}")
-            logger.info(f"  未匹配数据包: {len(self.unmatched_packets)}")
+            logger.info(f"  未匹配数据包: {self.unmatched_count}")
             self.save_results()
 
             # 关闭TCP连接
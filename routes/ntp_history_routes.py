@@ -4,9 +4,11 @@ NTP历史客户端查询API路由
 """
 
 import math
+from datetime import datetime
 from flask import Blueprint, jsonify, request
 from services.ntp_data_ingestion_service import (
-    get_historical_clients, get_client_detail,
+    get_historical_clients, get_historical_clients_after,
+    encode_client_cursor, decode_client_cursor, get_client_detail,
     get_interface_statistics, get_service_stats
 )
 import logging
@@ -27,6 +29,8 @@ def get_clients_list():
         - page_size (int): 每页记录数，默认10，最大100
         - search_ip (str): 用于精确匹配的客户端IP地址
         - interface_name (str): 筛选特定网卡下发现的客户端
+        - cursor (str): 游标分页参数，提供时忽略page且不返回总数；
+          首页可传空字符串，后续页使用上一页返回的next_cursor
 
     Returns:
         JSON response containing:
@@ -60,6 +64,41 @@ def get_clients_list():
         search_ip = search_ip if search_ip else None
         interface_name = interface_name if interface_name else None
 
+        # 游标分页：避免大表上的COUNT和OFFSET扫描
+        if 'cursor' in request.args:
+            cursor_arg = request.args.get('cursor', '').strip()
+            try:
+                cursor = decode_client_cursor(cursor_arg) if cursor_arg else None
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'message': 'Invalid cursor'
+                }), 400
+
+            clients, next_cursor = get_historical_clients_after(
+                cursor=cursor,
+                page_size=page_size,
+                search_ip=search_ip,
+                interface_name=interface_name
+            )
+
+            return jsonify({
+                'success': True,
+                'data': {
+                    'clients': clients,
+                    'pagination': {
+                        'page_size': page_size,
+                        'has_next': next_cursor is not None,
+                        'next_cursor': encode_client_cursor(next_cursor) if next_cursor else None
+                    },
+                    'filters': {
+                        'search_ip': search_ip,
+                        'interface_name': interface_name
+                    }
+                },
+                'message': f'Successfully retrieved {len(clients)} clients'
+            }), 200
+
         # 查询数据
         clients, total_count = get_historical_clients(
             page=page,
@@ -370,10 +409,10 @@ def export_clients():
                 'message': 'Invalid limit. Must be between 1 and 10000'
             }), 400
 
-        # 简化实现：导出所有数据
-        clients, total_count = get_historical_clients(
-            page=1,
-            page_size=min(limit, total_count) if 'total_count' in locals() else limit,
+        # 简化实现：导出最近的limit条记录（游标分页的首页，不需要统计总数）
+        clients, _ = get_historical_clients_after(
+            cursor=None,
+            page_size=limit,
             search_ip=filters.get('search_ip'),
             interface_name=filters.get('interface_name')
         )
@@ -408,9 +447,7 @@ def export_clients():
                 fieldnames = clients[0].keys()
                 writer = csv.DictWriter(output, fieldnames=fieldnames)
                 writer.writeheader()
-
-                for client in clients:
-                    writer.writerow(client)
+                writer.writerows(clients)
 
             csv_data = output.getvalue()
             output.close()
@@ -1,13 +1,20 @@
 import os
 import shutil
+import time
 import logging
-from datetime import datetime
-from typing import Optional, Tuple, List
+import threading
+from typing import Optional, Tuple, List, Dict
 import config
-from utils.config_parser import parse_network_file
+from utils.config_parser import parse_network_file, forget_parsed_network_file
 
 logger = logging.getLogger(__name__)
 
+# Interface name -> config file path, rebuilt when any .network file is added, removed or
+# changed; _iface_to_path_key holds the (path, st_ino, st_mtime_ns, st_size) of every file
+_iface_to_path: Dict[str, str] = {}
+_iface_to_path_key: Optional[Tuple[Tuple[str, int, int, int], ...]] = None
+_iface_to_path_lock = threading.Lock()
+
 
 def ensure_directory_exists(directory: str) -> None:
     """
@@ -20,26 +27,31 @@ def ensure_directory_exists(directory: str) -> None:
         os.makedirs(directory, exist_ok=True)
 
 
-def backup_config_file(file_path: str) -> Tuple[bool, Optional[str]]:
+def backup_config_file(file_path: str,
+                       stat_result: Optional[os.stat_result] = None) -> Tuple[bool, Optional[str]]:
     """
     Create a backup of a configuration file.
 
     Args:
         file_path: Path to the file to back up
+        stat_result: Result of a stat() the caller already made on file_path, if any
 
     Returns:
         Tuple containing:
         - bool: Success status
         - Optional[str]: Backup file path if successful, error message otherwise
     """
-    if not os.path.exists(file_path):
-        return False, f"File does not exist: {file_path}"
+    if stat_result is None:
+        try:
+            os.stat(file_path)
+        except OSError:
+            return False, f"File does not exist: {file_path}"
 
     ensure_directory_exists(config.NETWORK_CONFIG_BACKUP_DIR)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime())
     filename = os.path.basename(file_path)
-    backup_path = f"{config.NETWORK_CONFIG_BACKUP_DIR}{filename}.{timestamp}"
+    backup_path = os.path.join(config.NETWORK_CONFIG_BACKUP_DIR, f"{filename}.{timestamp}")
 
     try:
         shutil.copy2(file_path, backup_path)
@@ -66,8 +78,13 @@ def write_config_file(filename: str, content: str) -> Tuple[bool, Optional[str]]
     file_path = os.path.join(config.NETWORK_CONFIG_DIR, filename)
 
     # Backup existing file if it exists
-    if os.path.exists(file_path):
-        success, result = backup_config_file(file_path)
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
+        stat_result = None
+
+    if stat_result is not None:
+        success, result = backup_config_file(file_path, stat_result=stat_result)
         if not success:
             return False, f"Failed to create backup: {result}"
 
@@ -75,6 +92,8 @@ def write_config_file(filename: str, content: str) -> Tuple[bool, Optional[str]]
         ensure_directory_exists(config.NETWORK_CONFIG_DIR)
         with open(file_path, 'w') as f:
             f.write(content)
+        # The rewrite may keep the same size and mtime tick; never serve the old parse
+        forget_parsed_network_file(file_path)
         logger.info(f"Successfully wrote configuration to {file_path}")
         return True, None
     except Exception as e:
@@ -92,10 +111,14 @@ def find_network_files() -> List[str]:
     network_files = []
 
     try:
-        if os.path.exists(config.NETWORK_CONFIG_DIR):
-            for filename in os.listdir(config.NETWORK_CONFIG_DIR):
-                if filename.endswith(".network"):
-                    network_files.append(os.path.join(config.NETWORK_CONFIG_DIR, filename))
+        # scandir returns the entry type with the listing, so no extra stat per file
+        with os.scandir(config.NETWORK_CONFIG_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith(".network") and entry.is_file():
+                    network_files.append(entry.path)
+    except FileNotFoundError:
+        # No configuration directory yet
+        pass
     except Exception as e:
         logger.exception("Error finding network files")
 
@@ -118,11 +141,64 @@ def get_interface_config_file(interface_name: str) -> Optional[str]:
     if os.path.exists(expected_path):
         return expected_path
 
-    # If the expected filename doesn't exist, search for files that might contain this interface
-    network_files = find_network_files()
-    for file_path in network_files:
-        interface, _ = parse_network_file(file_path)
-        if interface == interface_name:
-            return file_path
+    # If the expected filename doesn't exist, look the interface up in the parsed file index
+    return _get_interface_file_index().get(interface_name)
+
+
+def _stat_network_files() -> List[Tuple[str, int, int, int]]:
+    """
+    List the .network files in the configuration directory with their stat identity.
+
+    Returns:
+        List[Tuple[str, int, int, int]]: (path, st_ino, st_mtime_ns, st_size) per file,
+        in directory order
+    """
+    network_files = []
+
+    try:
+        with os.scandir(config.NETWORK_CONFIG_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith(".network") and entry.is_file():
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        # Removed since the listing
+                        continue
+                    network_files.append((entry.path, st.st_ino, st.st_mtime_ns, st.st_size))
+    except FileNotFoundError:
+        # No configuration directory yet
+        pass
+    except Exception as e:
+        logger.exception("Error finding network files")
+
+    return network_files
+
 
-    return None
\ No newline at end of file
+def _get_interface_file_index() -> Dict[str, str]:
+    """
+    Get the mapping of interface names to the configuration files that match them.
+
+    The mapping is rebuilt whenever a .network file is added, removed or changed, including
+    in-place edits that leave the directory mtime untouched; unchanged files are served by
+    the parse cache, so a rebuild only re-reads the files that changed.
+
+    Returns:
+        Dict[str, str]: Interface name to configuration file path
+    """
+    global _iface_to_path, _iface_to_path_key
+
+    network_files = _stat_network_files()
+    files_key = tuple(network_files)
+
+    with _iface_to_path_lock:
+        if files_key != _iface_to_path_key:
+            index = {}
+            for file_path, _, _, _ in network_files:
+                interface, _ = parse_network_file(file_path)
+                # Keep the first matching file, as the previous sequential scan did
+                if interface and interface not in index:
+                    index[interface] = file_path
+            _iface_to_path = index
+            _iface_to_path_key = files_key
+
+        return _iface_to_path
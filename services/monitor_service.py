@@ -1,10 +1,82 @@
 import psutil
 import logging
+import threading
+import time
 from datetime import datetime, timezone
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Optional
 
 logger = logging.getLogger(__name__)
 
+# CPU使用率后台采样间隔（秒）
+CPU_SAMPLE_INTERVAL_SECONDS = 1.0
+
+
+class CPUSampler:
+    """
+    CPU使用率后台采样器
+
+    每个采样周期同时采集全局和每核心的CPU使用率并发布为一个快照，
+    各接口直接读取最新快照，不再在请求中阻塞1秒采样。
+    """
+
+    def __init__(self, interval: float = CPU_SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_started(self) -> None:
+        """首次使用时启动采样线程"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="CPUSampler", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        """采样循环"""
+        # 首次调用只建立基准值，返回结果无意义
+        psutil.cpu_percent(interval=None)
+        psutil.cpu_percent(interval=None, percpu=True)
+
+        while True:
+            time.sleep(self.interval)
+            try:
+                snapshot = {
+                    'cpu_percent': psutil.cpu_percent(interval=None),
+                    'per_core': psutil.cpu_percent(interval=None, percpu=True)
+                }
+                with self._lock:
+                    self._snapshot = snapshot
+                self._ready.set()
+            except Exception:
+                logger.exception("CPU sampling failed")
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """
+        获取最新的CPU采样快照
+
+        Returns:
+            Dict[str, Any]: 包含cpu_percent（全局）和per_core（每核心）的快照
+        """
+        self._ensure_started()
+
+        # 仅在采样线程刚启动时等待第一个采样周期
+        if self._ready.wait(timeout=self.interval * 2):
+            with self._lock:
+                return self._snapshot
+
+        # 采样线程未能及时产出数据，退回到同步采样：在同一个阻塞周期内采集每核心使用率，
+        # 全局使用率取各核心的平均值（interval=None在请求线程中没有基准值，只会得到0.0）
+        per_core = psutil.cpu_percent(interval=self.interval, percpu=True)
+        return {
+            'cpu_percent': round(sum(per_core) / len(per_core), 1) if per_core else 0.0,
+            'per_core': per_core
+        }
+
+
+cpu_sampler = CPUSampler()
+
 
 def get_system_stats() -> Tuple[bool, Dict[str, Any]]:
     """
@@ -16,8 +88,8 @@ def get_system_stats() -> Tuple[bool, Dict[str, Any]]:
         - Dict[str, Any]: System statistics data or error message
     """
     try:
-        # 获取CPU使用率 (1秒采样间隔，获取全局平均值)
-        cpu_percent = psutil.cpu_percent(interval=1)
+        # 获取CPU使用率 (后台采样器的最新全局平均值)
+        cpu_percent = cpu_sampler.get_snapshot()['cpu_percent']
 
         # 获取内存信息
         memory = psutil.virtual_memory()
@@ -70,8 +142,8 @@ def get_detailed_cpu_info() -> Tuple[bool, Dict[str, Any]]:
         # CPU频率信息
         cpu_freq = psutil.cpu_freq()
 
-        # 每个CPU核心的使用率
-        cpu_per_core = psutil.cpu_percent(interval=1, percpu=True)
+        # 每个CPU核心的使用率 (与get_system_stats共用同一个后台采样快照)
+        cpu_per_core = cpu_sampler.get_snapshot()['per_core']
 
         # 构建详细信息
         cpu_info = {
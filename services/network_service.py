@@ -11,6 +11,16 @@ from utils.validators import validate_network_config
 
 logger = logging.getLogger(__name__)
 
+# Link status -> interface status; anything else is reported as 'unknown'
+_STATUS_MAP = {
+    'up': 'up',
+    'down': 'down',
+    'no-carrier': 'no-carrier'
+}
+
+# Default routes are driven by the Gateway= setting, never carried over as [Route] sections
+_DEFAULT_ROUTES = frozenset(('0.0.0.0/0', '::/0'))
+
 
 def filter_user_configurable_routes(routes: List[Dict]) -> List[Route]:
     """
@@ -60,14 +70,17 @@ def get_all_interfaces() -> List[NetworkInterface]:
     active_routes = get_active_routes()
 
     # Create a mapping of interface names to their configuration files
-    interface_configs = {}
-    for file_path in network_files:
-        interface_name, config_data = parse_network_file(file_path)
-        if interface_name and config_data:
-            interface_configs[interface_name] = {
-                'file_path': file_path,
-                'config': config_data
-            }
+    # (configs for interfaces that are not present on the system are never looked up, so drop them here)
+    system_interface_set = set(system_interfaces)
+    parsed_files = ((file_path, parse_network_file(file_path)) for file_path in network_files)
+    interface_configs = {
+        interface_name: {
+            'file_path': file_path,
+            'config': config_data
+        }
+        for file_path, (interface_name, config_data) in parsed_files
+        if interface_name in system_interface_set and config_data
+    }
 
     # Create NetworkInterface objects for each system interface
     for interface_name in system_interfaces:
@@ -92,14 +105,7 @@ def get_all_interfaces() -> List[NetworkInterface]:
             )
 
         # Set status based on link status
-        if link_status == 'up':
-            interface.status = "up"
-        elif link_status == 'down':
-            interface.status = "down"
-        elif link_status == 'no-carrier':
-            interface.status = "no-carrier"
-        else:
-            interface.status = "unknown"
+        interface.status = _STATUS_MAP.get(link_status, "unknown")
 
         # Add active system routes (这些已经在system_service.py中过滤过了)
         if interface_name in active_routes:
@@ -153,14 +159,7 @@ def get_interface(interface_name: str) -> Optional[NetworkInterface]:
             )
 
     # Set status based on link status
-    if link_status == 'up':
-        interface.status = "up"
-    elif link_status == 'down':
-        interface.status = "down"
-    elif link_status == 'no-carrier':
-        interface.status = "no-carrier"
-    else:
-        interface.status = "unknown"
+    interface.status = _STATUS_MAP.get(link_status, "unknown")
 
     # Get active routes for this interface (这些已经在system_service.py中过滤过了)
     active_routes = get_active_routes()
@@ -199,7 +198,7 @@ def configure_interface(interface_name: str, config_data: Dict[str, Any]) -> Tup
     # Create a new NetworkInterface object with the updated configuration
     new_interface = NetworkInterface(
         interface_name=interface_name,
-        config_file=f"{config.NETWORK_CONFIG_DIR}{interface_name}.network",
+        config_file=os.path.join(config.NETWORK_CONFIG_DIR, f"{interface_name}.network"),
         ipv4_addresses=config_data.get('ipv4_addresses', []),
         ipv6_addresses=config_data.get('ipv6_addresses', []),
         ipv4_gateway=config_data.get('ipv4_gateway'),
@@ -224,20 +223,18 @@ def configure_interface(interface_name: str, config_data: Dict[str, Any]) -> Tup
 
     # Add active system routes that are not managed by systemd-networkd
     if current_interface and current_interface.active_system_routes:
-        managed_routes = set()
-        if current_interface.systemd_networkd_routes:
-            managed_routes = {(route.destination, route.gateway) for route in current_interface.systemd_networkd_routes}
+        managed_routes = {(route.destination, route.gateway) for route in current_interface.systemd_networkd_routes}
 
         # Add non-managed active routes to the new configuration
         for route in current_interface.active_system_routes:
             route_key = (route.destination, route.gateway)
             if (route_key not in managed_routes and
-                    route.destination not in ['0.0.0.0/0', '::/0'] and
+                    route.destination not in _DEFAULT_ROUTES and
                     not should_exclude_systemd_route(route.destination, route.gateway or '')):
                 new_interface.systemd_networkd_routes.append(route)
 
-    # Generate configuration file content
-    config_content = generate_network_config(new_interface)
+    # Generate configuration file content (every route above already passed should_exclude_systemd_route)
+    config_content = generate_network_config(new_interface, routes_prefiltered=True)
 
     # Write configuration to file
     success, error = write_config_file(f"{interface_name}.network", config_content)
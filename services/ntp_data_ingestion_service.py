@@ -3,24 +3,36 @@ NTP数据接收处理服务
 负责接收来自ntp_worker.py进程的TCP数据，进行数据处理和数据库存储
 """
 
+import asyncio
 import json
 import logging
-import queue
-import socketserver
+import sqlite3
 import threading
 import time
+from collections import deque
+from itertools import chain
+from operator import itemgetter
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
-from sqlalchemy import create_engine, and_, or_, func
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import create_engine, event, and_, or_, func, delete, select, text, tuple_
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker
 
 import config
-from models.ntp_models import Base, NTPClient
+from models.ntp_models import Base, NTPClient, SESSION_ROW_COLUMNS, SESSION_UPDATE_COLUMNS, to_epoch_seconds
+
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，未安装时使用标准库json
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# 直接解析bytes的JSON解码函数（orjson.JSONDecodeError是json.JSONDecodeError的子类）
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 
 def init_db() -> None:
     """
@@ -29,71 +41,421 @@ def init_db() -> None:
     try:
         engine = create_engine(f'sqlite:///{config.NTP_DB_PATH}', echo=config.DEBUG)
         Base.metadata.create_all(engine)
+
+        with engine.begin() as conn:
+            # 旧版本数据库的client_ip只有普通索引，补建upsert所需的唯一索引
+            conn.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_client_ip ON ntp_clients (client_ip)"
+            ))
+            # 唯一索引已覆盖client_ip上的查询，旧的普通索引只会增加每次写入的维护开销
+            conn.execute(text("DROP INDEX IF EXISTS ix_ntp_clients_client_ip"))
+
+            # 旧版本数据库没有整数时间戳列，补充该列并由last_seen_timestamp回填
+            columns = {row[1] for row in conn.execute(text("PRAGMA table_info(ntp_clients)"))}
+            if 'last_seen_epoch' not in columns:
+                conn.execute(text("ALTER TABLE ntp_clients ADD COLUMN last_seen_epoch INTEGER"))
+                conn.execute(text(
+                    "UPDATE ntp_clients SET last_seen_epoch = CAST(strftime('%s', last_seen_timestamp) AS INTEGER)"
+                ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_last_seen_epoch ON ntp_clients (last_seen_epoch)"
+            ))
+            # 按网卡筛选的客户端列表按 (last_seen_epoch, id) 排序，直接按索引顺序读取，无需临时排序
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_interface_last_seen_epoch "
+                "ON ntp_clients (interface_name, last_seen_epoch)"
+            ))
+            # 排序、分页和清理都改用last_seen_epoch后，last_seen_timestamp上的旧索引不再被查询使用，
+            # 却仍要在每次upsert时维护，旧数据库中一并删除
+            conn.execute(text("DROP INDEX IF EXISTS idx_last_seen"))
+            conn.execute(text("DROP INDEX IF EXISTS idx_interface_last_seen"))
+
         logger.info(f"数据库初始化完成: {config.NTP_DB_PATH}")
     except Exception as e:
         logger.error(f"数据库初始化失败: {e}")
         raise
 
 
-class NTPDataRequestHandler(socketserver.StreamRequestHandler):
+# 每个SQLite连接建立时执行的PRAGMA：
+# WAL模式下查询接口与批量写入可以并发进行，synchronous=NORMAL在WAL下只在检查点时fsync
+SQLITE_CONNECT_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """SQLAlchemy connect事件回调：为新建的SQLite连接设置PRAGMA"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_CONNECT_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def _build_upsert_statement():
+    """
+    构建批量upsert语句：新客户端插入，已存在的客户端（按client_ip）更新会话字段并累加会话数
+
+    语句不绑定具体数据，编译为SQL文本后由写入连接以executemany方式批量执行
+
+    Returns:
+        SQLite INSERT ... ON CONFLICT DO UPDATE 语句
+    """
+    stmt = sqlite_insert(NTPClient.__table__)
+
+    update_set = {name: stmt.excluded[name] for name in SESSION_UPDATE_COLUMNS}
+    update_set['session_count'] = NTPClient.__table__.c.session_count + stmt.excluded.session_count
+    update_set['updated_at'] = func.now()
+
+    return stmt.on_conflict_do_update(index_elements=['client_ip'], set_=update_set)
+
+
+def _compile_upsert_sql() -> Tuple[str, Tuple[str, ...]]:
+    """
+    将upsert语句编译为SQLite SQL文本
+
+    Returns:
+        Tuple[str, Tuple[str, ...]]: (SQL文本, 按占位符顺序排列的参数列名)
+    """
+    compiled = _build_upsert_statement().compile(
+        dialect=_SQLITE_DIALECT, column_keys=list(SESSION_ROW_COLUMNS)
+    )
+    return str(compiled), tuple(compiled.positiontup)
+
+
+_SQLITE_DIALECT = sqlite.dialect()
+
+# 预先编译一次，所有批次复用
+_UPSERT_SQL, _UPSERT_PARAM_COLUMNS = _compile_upsert_sql()
+_upsert_params_getter = itemgetter(*_UPSERT_PARAM_COLUMNS)
+
+
+def _build_multi_row_upsert_sql(row_count: int) -> str:
+    """
+    由单行upsert语句生成一条语句写入多行的 INSERT ... VALUES (...), (...) ON CONFLICT 语句
+
+    Args:
+        row_count: 每条语句写入的行数
+
+    Returns:
+        str: 多行upsert的SQL文本，参数为各行参数按顺序展开
     """
-    处理来自ntp_worker.py的TCP连接和数据接收
+    head, _, conflict_clause = _UPSERT_SQL.partition(' ON CONFLICT ')
+    insert_clause, _, values_group = head.partition(' VALUES ')
+    return (f"{insert_clause} VALUES {', '.join([values_group] * row_count)} "
+            f"ON CONFLICT {conflict_clause}")
+
+
+# 多行upsert每条语句的行数，参数总数需低于SQLite的变量数上限（3.32之前为999，之后为32766）
+_SQLITE_MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+MULTI_ROW_UPSERT_ROWS = min(500, _SQLITE_MAX_VARIABLES // len(_UPSERT_PARAM_COLUMNS))
+_MULTI_ROW_UPSERT_SQL = _build_multi_row_upsert_sql(MULTI_ROW_UPSERT_ROWS)
+
+
+def _execute_upsert(conn: sqlite3.Connection, rows: List[Dict[str, Any]]) -> None:
+    """
+    在当前事务中写入一个批次：每 MULTI_ROW_UPSERT_ROWS 行合并为一条多行upsert语句执行，
+    不足一整条语句的剩余行以单行语句executemany写入
+
+    Args:
+        conn: 写入连接
+        rows: 列值字典列表（client_ip不重复）
+    """
+    full_rows = len(rows) - len(rows) % MULTI_ROW_UPSERT_ROWS
+    for start in range(0, full_rows, MULTI_ROW_UPSERT_ROWS):
+        chunk = rows[start:start + MULTI_ROW_UPSERT_ROWS]
+        conn.execute(_MULTI_ROW_UPSERT_SQL, list(chain.from_iterable(map(_upsert_params_getter, chunk))))
+    if full_rows < len(rows):
+        # 参数按需逐行生成，不额外构建参数列表
+        conn.executemany(_UPSERT_SQL, map(_upsert_params_getter, rows[full_rows:]))
+
+
+# 与SQLAlchemy相同的DateTime存储格式，保证查询接口能正确读取原生连接写入的时间
+_DATETIME_COLUMNS = ('session_timestamp', 'first_seen_timestamp', 'last_seen_timestamp')
+_format_datetime = NTPClient.__table__.c.session_timestamp.type.dialect_impl(
+    _SQLITE_DIALECT).bind_processor(_SQLITE_DIALECT)
+
+
+# 每次从连接读取的最大字节数，一次读取通常包含多条会话数据
+READ_CHUNK_SIZE = 65536
+
+# 单条会话数据（一行JSON）的最大长度，超出视为异常数据并丢弃
+MAX_LINE_BYTES = 1024 * 1024
+
+# 自适应批次的上限：积压数据超过NTP_BATCH_SIZE时一次写入更多记录，但不超过此值
+MAX_BATCH_SIZE = 10000
+
+# 清理旧记录时每个事务删除的最大记录数，分块提交以免长时间持有写锁阻塞数据写入
+CLEANUP_CHUNK_SIZE = 5000
+
+# 网卡统计结果的缓存有效期（秒），数据未变化时缓存一直有效
+INTERFACE_STATS_CACHE_TTL_SECONDS = 5.0
+
+
+# 列表接口只查询摘要字段（与NTPClient.to_summary_dict一致），不构造ORM实例
+_SUMMARY_COLUMNS = tuple(NTPClient.__table__.c[name] for name in (
+    'id', 'client_ip', 'interface_name', 'ntp_version', 'stratum', 'server_ip',
+    'last_seen_timestamp', 'session_count', 'client_to_server_latency_seconds', 'total_process_time_seconds'
+))
+
+
+def _summary_from_row(row) -> Dict[str, Any]:
+    """将摘要字段查询结果行转换为与NTPClient.to_summary_dict相同格式的字典"""
+    summary = dict(row)
+    summary.pop('last_seen_epoch', None)
+    last_seen = summary['last_seen_timestamp']
+    summary['last_seen_timestamp'] = last_seen.isoformat() if last_seen else None
+    return summary
+
+
+def _client_list_filters(search_ip: Optional[str], interface_name: Optional[str]) -> list:
+    """构建客户端列表查询的过滤条件"""
+    filters = []
+    if search_ip:
+        filters.append(NTPClient.client_ip == search_ip)
+    if interface_name:
+        filters.append(NTPClient.interface_name == interface_name)
+    return filters
+
+
+def _max_client_id(conn: sqlite3.Connection) -> int:
+    """当前最大的客户端记录id，表为空时返回0"""
+    return conn.execute("SELECT max(id) FROM ntp_clients").fetchone()[0] or 0
+
+
+class SessionDataBuffer:
     """
+    TCP接收端与数据处理线程之间的有界缓冲区
+
+    生产者只有事件循环线程，消费者只有数据处理线程（单生产者单消费者），
+    CPython中deque的append/popleft本身是原子操作，无需queue.Queue的互斥锁和条件变量
+    """
+
+    def __init__(self, maxsize: int):
+        """
+        初始化缓冲区
+
+        Args:
+            maxsize: 最大缓存条数，超出时丢弃新数据
+        """
+        self.maxsize = maxsize
+        self._items = deque()
+        self._not_empty = threading.Event()
+
+    def put_nowait(self, item: Dict[str, Any]) -> bool:
+        """
+        写入一条数据（仅由生产者调用）
+
+        Returns:
+            bool: 写入是否成功，缓冲区已满时返回False
+        """
+        if len(self._items) >= self.maxsize:
+            return False
+
+        self._items.append(item)
+        # Event.set()每次都要获取内部锁；消费者未在等待（标志已置位）时跳过通知。
+        # 消费者在clear()之后会再检查一次缓冲区，因此不会漏掉此处写入的数据
+        if not self._not_empty.is_set():
+            self._not_empty.set()
+        return True
+
+    def wait(self, timeout: float) -> bool:
+        """
+        等待缓冲区中有数据（仅由消费者调用）
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            bool: 缓冲区是否有数据
+        """
+        if self._items:
+            return True
+
+        self._not_empty.clear()
+        # 清除标志前写入的数据不会再触发通知，清除后需要再检查一次
+        if self._items:
+            return True
+
+        return self._not_empty.wait(timeout)
+
+    def pop_many(self, out: List[Dict[str, Any]], max_items: int) -> int:
+        """
+        不等待地取出最多max_items条数据追加到out（仅由消费者调用）
+
+        Returns:
+            int: 取出的数据条数
+        """
+        items = self._items
+        count = 0
+
+        while count < max_items and items:
+            out.append(items.popleft())
+            count += 1
+
+        return count
+
+    def qsize(self) -> int:
+        """当前缓存的数据条数"""
+        return len(self._items)
+
+
+class NTPDataStreamServer:
+    """
+    基于asyncio的TCP数据接收服务器
+    在单个事件循环线程中处理所有ntp_worker.py连接，不再为每个连接创建线程
+    """
+
+    def __init__(self, host: str, port: int, data_queue: SessionDataBuffer):
+        """
+        初始化服务器
+
+        Args:
+            host: 监听地址
+            port: 监听端口
+            data_queue: 接收到的会话数据推入的处理队列
+        """
+        self.host = host
+        self.port = port
+        self.data_queue = data_queue
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._start_error: Optional[BaseException] = None
+
+    def start(self) -> None:
+        """
+        在后台线程中启动事件循环并开始监听
+
+        Raises:
+            OSError: 监听端口绑定失败等启动错误
+        """
+        self._thread = threading.Thread(target=self._run_loop, name="NTPTCPServer")
+        self._thread.daemon = True
+        self._thread.start()
+
+        # 等待监听套接字创建完成，使绑定失败能在调用方抛出
+        self._started.wait()
+        if self._start_error is not None:
+            raise self._start_error
+
+    def stop(self) -> None:
+        """停止监听并关闭所有连接"""
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=10)
+
+    def _run_loop(self) -> None:
+        """事件循环线程入口"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+
+        try:
+            self._server = loop.run_until_complete(
+                asyncio.start_server(self._handle_connection, self.host, self.port, reuse_address=True)
+            )
+        except BaseException as e:
+            self._start_error = e
+            self._started.set()
+            loop.close()
+            return
+
+        self._started.set()
 
-    def handle(self):
-        """处理客户端连接"""
-        client_address = self.client_address[0]
+        try:
+            loop.run_forever()
+        finally:
+            # 停止监听并取消仍在进行的连接处理
+            self._server.close()
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """处理来自ntp_worker.py的单个连接"""
+        peername = writer.get_extra_info('peername')
+        client_address = peername[0] if peername else 'unknown'
         logger.info(f"NTP数据客户端连接: {client_address}")
 
+        pending = b''
+
         try:
             while True:
-                # 读取一行数据（以换行符分隔）
-                line = self.rfile.readline()
-                if not line:
+                # 按块读取数据，一次读取中的多条会话数据（以换行符分隔）逐行处理
+                chunk = await reader.read(READ_CHUNK_SIZE)
+                if not chunk:
                     break
 
-                try:
-                    # 解码并解析JSON数据
-                    data_str = line.decode('utf-8').strip()
-                    if not data_str:
-                        continue
+                lines = (pending + chunk).split(b'\n')
+                pending = lines.pop()
+                for line in lines:
+                    self._handle_line(line)
 
-                    session_data = json.loads(data_str)
+                if len(pending) > MAX_LINE_BYTES:
+                    logger.warning(f"单条数据超过 {MAX_LINE_BYTES} 字节，丢弃数据")
+                    pending = b''
 
-                    # 将数据推入处理队列
-                    self.server.data_queue.put(session_data, block=False)
-
-                    logger.debug(f"接收到NTP会话数据: {session_data.get('client_ip', 'unknown')}")
-
-                except json.JSONDecodeError as e:
-                    logger.warning(f"JSON解析失败: {e}, 数据: {data_str[:100]}")
-                except queue.Full:
-                    logger.warning("数据队列已满，丢弃数据")
-                except Exception as e:
-                    logger.error(f"处理数据失败: {e}")
+            # 连接关闭前最后一条未以换行符结尾的数据
+            if pending:
+                self._handle_line(pending)
 
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"连接处理异常: {e}")
         finally:
+            writer.close()
             logger.info(f"NTP数据客户端断开连接: {client_address}")
 
+    def _handle_line(self, line: bytes) -> None:
+        """解析一行会话数据并推入处理队列"""
+        try:
+            # 直接从bytes解析JSON数据，无需先解码为str
+            line = line.strip()
+            if not line:
+                return
 
-class ThreadedTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
-    """
-    多线程TCP服务器，支持并发连接
-    """
-    allow_reuse_address = True
-    daemon_threads = True
+            session_data = _json_loads(line)
 
-    def __init__(self, server_address, RequestHandlerClass, data_queue):
-        super().__init__(server_address, RequestHandlerClass)
-        self.data_queue = data_queue
+            # 在接收端丢弃缺少必要字段的数据，不占用队列空间，数据处理线程只处理有效数据
+            if (not isinstance(session_data, dict) or
+                    not session_data.get('client_ip') or not session_data.get('interface_name')):
+                logger.warning(f"数据缺少必要字段: {line[:100]!r}")
+                return
+
+            # 将数据推入处理队列
+            if not self.data_queue.put_nowait(session_data):
+                logger.warning("数据队列已满，丢弃数据")
+                return
+
+            logger.debug(f"接收到NTP会话数据: {session_data.get('client_ip', 'unknown')}")
+
+        except json.JSONDecodeError as e:
+            logger.warning(f"JSON解析失败: {e}, 数据: {line[:100]!r}")
+        except Exception as e:
+            logger.error(f"处理数据失败: {e}")
 
 
 class NTPDataIngestionService:
     """
     NTP数据接收处理服务
     负责TCP服务器、数据处理和数据库操作
+
+    数据库写入在本进程的数据处理线程中完成：写入统计、查询缓存的数据版本号
+    都依赖与查询接口共享的进程内状态；sqlite3执行语句和提交时会释放GIL，
+    事件循环线程接收数据不会被提交阻塞
     """
 
     def __init__(self):
@@ -104,17 +466,23 @@ class NTPDataIngestionService:
         self.batch_interval = config.NTP_BATCH_INTERVAL_SECONDS
 
         # 线程安全的数据队列
-        self.data_queue = queue.Queue(maxsize=1000)  # 限制队列大小防止内存溢出
+        self.data_queue = SessionDataBuffer(maxsize=1000)  # 限制队列大小防止内存溢出
 
         # 服务状态
         self.running = False
         self.tcp_server = None
         self.processing_thread = None
-        self.server_thread = None
 
         # 数据库相关
         self.engine = None
         self.SessionLocal = None
+        # 数据处理线程长期持有的原生sqlite3写入连接，绕过ORM直接批量执行upsert
+        self._writer_conn: Optional[sqlite3.Connection] = None
+
+        # 数据版本号，每次写入数据库后递增，用于判断查询缓存是否失效
+        self._data_version = 0
+        # 网卡统计缓存: (数据版本号, 缓存时间, 统计结果)
+        self._iface_stats_cache: Optional[Tuple[int, float, List[Dict[str, Any]]]] = None
 
         # 统计信息
         self.stats = {
@@ -135,10 +503,12 @@ class NTPDataIngestionService:
             self.engine = create_engine(
                 f'sqlite:///{config.NTP_DB_PATH}',
                 echo=config.DEBUG,
-                pool_pre_ping=True,
+                # 本地SQLite文件连接不会因网络中断失效，连接池复用连接时无需每次执行探活查询
                 connect_args={'check_same_thread': False}  # SQLite多线程支持
             )
-            self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+            event.listen(self.engine, 'connect', _apply_sqlite_pragmas)
+            self.SessionLocal = sessionmaker(autocommit=False, autoflush=False,
+                                             expire_on_commit=False, bind=self.engine)
             logger.info("数据库连接初始化完成")
         except Exception as e:
             logger.error(f"数据库连接初始化失败: {e}")
@@ -158,22 +528,12 @@ class NTPDataIngestionService:
         try:
             logger.info(f"启动NTP数据接收服务: {self.host}:{self.port}")
 
-            # 创建TCP服务器
-            self.tcp_server = ThreadedTCPServer(
-                (self.host, self.port),
-                NTPDataRequestHandler,
-                self.data_queue
-            )
+            # 创建并启动TCP服务器（独立的事件循环线程）
+            self.tcp_server = NTPDataStreamServer(self.host, self.port, self.data_queue)
+            self.tcp_server.start()
 
-            # 启动服务器线程
-            self.server_thread = threading.Thread(
-                target=self.tcp_server.serve_forever,
-                name="NTPTCPServer"
-            )
-            self.server_thread.daemon = True
-            self.server_thread.start()
-
-            # 启动数据处理线程
+            # 启动数据处理线程（先置运行标志，否则处理循环可能在启动瞬间直接退出）
+            self.running = True
             self.processing_thread = threading.Thread(
                 target=self._data_processing_loop,
                 name="NTPDataProcessor"
@@ -181,7 +541,6 @@ class NTPDataIngestionService:
             self.processing_thread.daemon = True
             self.processing_thread.start()
 
-            self.running = True
             logger.info("NTP数据接收服务启动成功")
             return True
 
@@ -201,8 +560,7 @@ class NTPDataIngestionService:
         # 停止TCP服务器
         if self.tcp_server:
             try:
-                self.tcp_server.shutdown()
-                self.tcp_server.server_close()
+                self.tcp_server.stop()
             except Exception as e:
                 logger.warning(f"停止TCP服务器时出错: {e}")
 
@@ -213,9 +571,24 @@ class NTPDataIngestionService:
 
         # 处理剩余的数据
         self._process_remaining_data()
+        self._close_writer_connection()
 
         logger.info("NTP数据接收服务已停止")
 
+    def _get_writer_connection(self) -> sqlite3.Connection:
+        """获取写入连接，不存在时创建（自动提交模式，事务由调用方显式控制）"""
+        if self._writer_conn is None:
+            conn = sqlite3.connect(config.NTP_DB_PATH, check_same_thread=False, isolation_level=None)
+            _apply_sqlite_pragmas(conn, None)
+            self._writer_conn = conn
+        return self._writer_conn
+
+    def _close_writer_connection(self) -> None:
+        """关闭写入连接"""
+        if self._writer_conn is not None:
+            self._writer_conn.close()
+            self._writer_conn = None
+
     def _data_processing_loop(self) -> None:
         """数据处理循环"""
         logger.info("数据处理线程启动")
@@ -225,18 +598,14 @@ class NTPDataIngestionService:
 
         while self.running:
             try:
-                # 尝试从队列获取数据
-                try:
-                    data = self.data_queue.get(timeout=1.0)
-                    batch_data.append(data)
-                    self.stats['total_received'] += 1
-
-                    # 标记任务完成
-                    self.data_queue.task_done()
-
-                except queue.Empty:
-                    # 队列为空，检查是否需要强制处理批次
-                    pass
+                # 等待数据到达后一次性取出队列中已有的数据，队列为空时检查是否需要强制处理批次。
+                # 有未写入的数据时只等待到批次间隔到期为止，到期即写入，不必再多等一个完整的等待周期
+                if batch_data:
+                    wait_timeout = max(0.0, last_batch_time + self.batch_interval - time.time())
+                else:
+                    wait_timeout = self.batch_interval
+                received_count = self._drain_queue(batch_data, timeout=min(1.0, wait_timeout))
+                self.stats['total_received'] += received_count
 
                 current_time = time.time()
 
@@ -248,8 +617,9 @@ class NTPDataIngestionService:
 
                 if should_process:
                     if batch_data:
-                        self._process_batch(batch_data.copy())
-                        batch_data.clear()
+                        # 直接交出当前列表并换用新列表，无需复制
+                        self._process_batch(batch_data)
+                        batch_data = []
                         last_batch_time = current_time
 
             except Exception as e:
@@ -261,62 +631,94 @@ class NTPDataIngestionService:
         if batch_data:
             self._process_batch(batch_data)
 
+        self._close_writer_connection()
         logger.info("数据处理线程结束")
 
+    def _drain_queue(self, batch_data: List[Dict[str, Any]], timeout: float) -> int:
+        """
+        从队列中突发取出数据：阻塞等待第一条，随后不等待地取出已排队的数据
+
+        批次目标大小随积压自适应：至少为batch_size，队列积压更多时一次取完（不超过MAX_BATCH_SIZE），
+        避免高负载下定时器触发时只写入很小的批次
+
+        Args:
+            batch_data: 接收数据的批次列表
+            timeout: 等待第一条数据的超时时间（秒）
+
+        Returns:
+            int: 本次取出的数据条数
+        """
+        if not self.data_queue.wait(timeout):
+            return 0
+
+        target_size = min(MAX_BATCH_SIZE, max(self.batch_size, len(batch_data) + self.data_queue.qsize()))
+        return self.data_queue.pop_many(batch_data, target_size - len(batch_data))
+
     def _process_batch(self, batch_data: List[Dict[str, Any]]) -> None:
         """
         批量处理数据
 
         Args:
-            batch_data: 待处理的数据列表
+            batch_data: 待处理的数据列表（已在接收端校验必要字段）
         """
         if not batch_data:
             return
 
         logger.debug(f"开始处理批次，数据量: {len(batch_data)}")
 
-        session = self.SessionLocal()
-        try:
-            inserted_count = 0
-            updated_count = 0
+        # 按client_ip合并同一批次内的重复客户端：保留最新数据，累加会话数，保留最早的首次发现时间
+        rows_by_ip: Dict[str, Dict[str, Any]] = {}
+        for session_data in batch_data:
+            try:
+                row = NTPClient.row_from_session_data(session_data)
+            except Exception as e:
+                logger.error(f"处理单条数据失败: {e}, 数据: {session_data}")
+                self.stats['processing_errors'] += 1
+                continue
 
-            for session_data in batch_data:
-                try:
-                    client_ip = session_data.get('client_ip')
-                    interface_name = session_data.get('interface_name')
-
-                    if not client_ip or not interface_name:
-                        logger.warning(f"数据缺少必要字段: {session_data}")
-                        continue
-
-                    # 查找现有记录（基于client_ip作为唯一标识）
-                    existing_client = session.query(NTPClient).filter(
-                        NTPClient.client_ip == client_ip
-                    ).first()
-
-                    if existing_client:
-                        # 更新现有记录
-                        existing_client.update_from_session_data(session_data)
-                        updated_count += 1
-                        logger.debug(f"更新客户端记录: {client_ip}")
-                    else:
-                        # 插入新记录
-                        new_client = NTPClient.from_session_data(session_data)
-                        session.add(new_client)
-                        inserted_count += 1
-                        logger.debug(f"插入新客户端记录: {client_ip}")
-
-                    self.stats['total_processed'] += 1
-
-                except Exception as e:
-                    logger.error(f"处理单条数据失败: {e}, 数据: {session_data}")
-                    self.stats['processing_errors'] += 1
-                    continue
+            previous = rows_by_ip.get(row['client_ip'])
+            if previous is not None:
+                row['session_count'] += previous['session_count']
+                row['first_seen_timestamp'] = previous['first_seen_timestamp']
+            rows_by_ip[row['client_ip']] = row
+
+        if not rows_by_ip:
+            return
+
+        rows = list(rows_by_ip.values())
+        record_count = sum(row['session_count'] for row in rows)
+
+        for row in rows:
+            for column in _DATETIME_COLUMNS:
+                row[column] = _format_datetime(row[column])
+
+        try:
+            conn = self._get_writer_connection()
 
-            # 提交事务
-            session.commit()
+            # 写事务内新插入的记录rowid依次为当前最大id加1，前后最大id之差即为插入数，
+            # 因此插入/更新的区分无需预先查询或缓存已存在的客户端IP
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                max_id_before = _max_client_id(conn)
+                _execute_upsert(conn, rows)
+                max_id_after = _max_client_id(conn)
+                conn.execute("COMMIT")
+                processed_count = record_count
+                inserted_count = max_id_after - max_id_before
+            except sqlite3.IntegrityError as e:
+                conn.execute("ROLLBACK")
+                logger.warning(f"批量写入失败，改为逐条写入: {e}")
+                processed_count, inserted_count = self._upsert_rows_individually(conn, rows)
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            self._data_version += 1
+
+            updated_count = processed_count - inserted_count
 
             # 更新统计信息
+            self.stats['total_processed'] += processed_count
             self.stats['total_inserted'] += inserted_count
             self.stats['total_updated'] += updated_count
             self.stats['last_batch_time'] = datetime.now()
@@ -324,28 +726,51 @@ class NTPDataIngestionService:
 
             logger.info(f"批次处理完成: 插入 {inserted_count}, 更新 {updated_count}")
 
-        except SQLAlchemyError as e:
+        except sqlite3.Error as e:
             logger.error(f"数据库操作失败: {e}")
-            session.rollback()
             self.stats['processing_errors'] += 1
         except Exception as e:
             logger.error(f"批次处理异常: {e}")
-            session.rollback()
             self.stats['processing_errors'] += 1
-        finally:
-            session.close()
+
+    def _upsert_rows_individually(self, conn: sqlite3.Connection,
+                                  rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        逐条写入数据，用于批量写入因个别记录违反约束而失败的情况
+
+        Args:
+            conn: 写入连接
+            rows: 列值字典列表
+
+        Returns:
+            Tuple[int, int]: (成功写入的会话记录数, 新插入的客户端数)
+        """
+        written_count = 0
+
+        # 违反约束的语句只回滚该语句本身，其余记录仍在同一事务中提交
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            max_id_before = _max_client_id(conn)
+            for row in rows:
+                try:
+                    conn.execute(_UPSERT_SQL, _upsert_params_getter(row))
+                    written_count += row['session_count']
+                except sqlite3.IntegrityError as e:
+                    logger.error(f"处理单条数据失败: {e}, 数据: {row}")
+                    self.stats['processing_errors'] += 1
+            max_id_after = _max_client_id(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+        return written_count, max_id_after - max_id_before
 
     def _process_remaining_data(self) -> None:
         """处理队列中剩余的数据"""
         remaining_data = []
-
-        try:
-            while True:
-                data = self.data_queue.get_nowait()
-                remaining_data.append(data)
-                self.data_queue.task_done()
-        except queue.Empty:
-            pass
+        self.data_queue.pop_many(remaining_data, self.data_queue.qsize())
 
         if remaining_data:
             logger.info(f"处理剩余数据: {len(remaining_data)} 条")
@@ -378,41 +803,78 @@ class NTPDataIngestionService:
         Returns:
             Tuple[List[Dict[str, Any]], int]: (客户端列表, 总数)
         """
-        session = self.SessionLocal()
+        filters = _client_list_filters(search_ip, interface_name)
+
         try:
-            # 构建查询
-            query = session.query(NTPClient)
+            with self.engine.connect() as conn:
+                # 获取总数
+                total_count = conn.execute(
+                    select(func.count()).select_from(NTPClient.__table__).where(*filters)
+                ).scalar()
+
+                # 添加排序和分页（按整数时间戳排序，id作为次排序键，与游标分页保持一致的稳定顺序）
+                stmt = (select(*_SUMMARY_COLUMNS)
+                        .where(*filters)
+                        .order_by(NTPClient.last_seen_epoch.desc(), NTPClient.id.desc()))
 
-            # 添加过滤条件
-            if search_ip:
-                query = query.filter(NTPClient.client_ip == search_ip)
+                if page_size > 0:
+                    offset = (page - 1) * page_size
+                    stmt = stmt.offset(offset).limit(page_size)
 
-            if interface_name:
-                query = query.filter(NTPClient.interface_name == interface_name)
+                rows = conn.execute(stmt).mappings().all()
 
-            # 获取总数
-            total_count = query.count()
+            return [_summary_from_row(row) for row in rows], total_count
 
-            # 添加排序和分页
-            query = query.order_by(NTPClient.last_seen_timestamp.desc())
+        except Exception as e:
+            logger.error(f"查询历史客户端失败: {e}")
+            return [], 0
+
+    def get_historical_clients_after(self, cursor: Optional[Tuple[int, int]] = None,
+                                     page_size: int = 10,
+                                     search_ip: Optional[str] = None,
+                                     interface_name: Optional[str] = None
+                                     ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[int, int]]]:
+        """
+        基于游标（keyset）分页获取历史NTP客户端列表
 
-            if page_size > 0:
-                offset = (page - 1) * page_size
-                query = query.offset(offset).limit(page_size)
+        按 (last_seen_epoch, id) 倒序翻页，不执行COUNT也不使用OFFSET，
+        查询代价与所在页数无关。
 
-            # 执行查询
-            clients = query.all()
+        Args:
+            cursor: 上一页返回的游标 (last_seen_epoch, id)，为None时从第一页开始
+            page_size: 每页大小
+            search_ip: 搜索的客户端IP（精确匹配）
+            interface_name: 筛选的网卡名称
 
-            # 转换为字典格式
-            client_list = [client.to_summary_dict() for client in clients]
+        Returns:
+            Tuple[List[Dict[str, Any]], Optional[Tuple[int, int]]]: (客户端列表, 下一页游标)
+        """
+        filters = _client_list_filters(search_ip, interface_name)
 
-            return client_list, total_count
+        if cursor is not None:
+            filters.append(tuple_(NTPClient.last_seen_epoch, NTPClient.id) < tuple_(*cursor))
+
+        try:
+            # 多取一条用于判断是否存在下一页
+            stmt = (select(*_SUMMARY_COLUMNS, NTPClient.last_seen_epoch)
+                    .where(*filters)
+                    .order_by(NTPClient.last_seen_epoch.desc(), NTPClient.id.desc())
+                    .limit(page_size + 1))
+
+            with self.engine.connect() as conn:
+                rows = conn.execute(stmt).mappings().all()
+
+            next_cursor = None
+            if len(rows) > page_size:
+                rows = rows[:page_size]
+                last = rows[-1]
+                next_cursor = (last['last_seen_epoch'], last['id'])
+
+            return [_summary_from_row(row) for row in rows], next_cursor
 
         except Exception as e:
-            logger.error(f"查询历史客户端失败: {e}")
-            return [], 0
-        finally:
-            session.close()
+            logger.error(f"游标分页查询历史客户端失败: {e}")
+            return [], None
 
     def get_client_detail(self, client_ip: str) -> Optional[Dict[str, Any]]:
         """
@@ -444,9 +906,20 @@ class NTPDataIngestionService:
         """
         获取各网卡的统计信息
 
+        分组统计需要扫描全表，结果按数据版本号缓存：数据未变化时直接返回缓存，
+        数据有变化时缓存最多保留 INTERFACE_STATS_CACHE_TTL_SECONDS 秒。
+
         Returns:
             List[Dict[str, Any]]: 网卡统计信息列表
         """
+        data_version = self._data_version
+        cached = self._iface_stats_cache
+        if cached is not None:
+            cached_version, cached_at, cached_statistics = cached
+            if (cached_version == data_version or
+                    time.monotonic() - cached_at < INTERFACE_STATS_CACHE_TTL_SECONDS):
+                return [dict(item) for item in cached_statistics]
+
         session = self.SessionLocal()
         try:
             # 按网卡分组统计
@@ -470,7 +943,8 @@ class NTPDataIngestionService:
                     'average_latency_seconds': float(result.avg_latency) if result.avg_latency else None
                 })
 
-            return statistics
+            self._iface_stats_cache = (data_version, time.monotonic(), statistics)
+            return [dict(item) for item in statistics]
 
         except Exception as e:
             logger.error(f"查询网卡统计信息失败: {e}")
@@ -488,24 +962,32 @@ class NTPDataIngestionService:
         Returns:
             int: 删除的记录数
         """
-        session = self.SessionLocal()
-        try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
+        cutoff_epoch = to_epoch_seconds(datetime.utcnow() - timedelta(days=days))
+        table = NTPClient.__table__
+        chunk_stmt = delete(table).where(table.c.id.in_(
+            select(table.c.id).where(table.c.last_seen_epoch < cutoff_epoch).limit(CLEANUP_CHUNK_SIZE)
+        ))
 
-            deleted_count = session.query(NTPClient).filter(
-                NTPClient.last_seen_timestamp < cutoff_date
-            ).delete()
+        deleted_count = 0
+        try:
+            # 分块删除，每块单独提交，块之间数据写入可以获得写锁
+            while True:
+                with self.engine.begin() as conn:
+                    chunk_count = conn.execute(chunk_stmt).rowcount
+                deleted_count += chunk_count
+                if chunk_count < CLEANUP_CHUNK_SIZE:
+                    break
 
-            session.commit()
             logger.info(f"清理了 {deleted_count} 条超过 {days} 天的旧记录")
-            return deleted_count
 
         except Exception as e:
-            logger.error(f"清理旧记录失败: {e}")
-            session.rollback()
-            return 0
+            # 已提交的分块不会回滚，返回实际删除的记录数
+            logger.error(f"清理旧记录失败: {e}, 已删除 {deleted_count} 条")
         finally:
-            session.close()
+            if deleted_count:
+                self._data_version += 1
+
+        return deleted_count
 
 
 # 全局服务实例
@@ -528,6 +1010,34 @@ def get_historical_clients(page: int = 1, page_size: int = 10,
     return get_ingestion_service().get_historical_clients(page, page_size, search_ip, interface_name)
 
 
+def get_historical_clients_after(cursor: Optional[Tuple[int, int]] = None,
+                                 page_size: int = 10,
+                                 search_ip: Optional[str] = None,
+                                 interface_name: Optional[str] = None
+                                 ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[int, int]]]:
+    """基于游标分页获取历史NTP客户端列表"""
+    return get_ingestion_service().get_historical_clients_after(cursor, page_size, search_ip, interface_name)
+
+
+def encode_client_cursor(cursor: Tuple[int, int]) -> str:
+    """将分页游标编码为字符串，格式为 <Unix时间戳>,<id>"""
+    last_seen_epoch, client_id = cursor
+    return f"{last_seen_epoch},{client_id}"
+
+
+def decode_client_cursor(value: str) -> Tuple[int, int]:
+    """
+    解析 encode_client_cursor 生成的游标字符串
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    last_seen_epoch, sep, client_id = value.partition(',')
+    if not sep:
+        raise ValueError(f"无效的游标: {value}")
+    return int(last_seen_epoch), int(client_id)
+
+
 def get_client_detail(client_ip: str) -> Optional[Dict[str, Any]]:
     """获取客户端详细信息"""
     return get_ingestion_service().get_client_detail(client_ip)
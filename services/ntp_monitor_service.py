@@ -1,6 +1,7 @@
 import os
 import signal
 import subprocess
+import threading
 import time
 import logging
 import psutil
@@ -11,6 +12,9 @@ import config
 
 logger = logging.getLogger(__name__)
 
+# 监控进程PID状态的缓存有效期（秒），状态接口频繁轮询时复用最近一次检查结果
+PID_STATUS_CACHE_TTL_SECONDS = 1.0
+
 
 class NTPMonitorManager:
     """
@@ -27,6 +31,12 @@ class NTPMonitorManager:
         self.pid_dir = Path(pid_dir or config.NTP_PID_DIR)
         self.pid_dir.mkdir(parents=True, exist_ok=True)
 
+        # 网卡 -> (检查时间, 存活进程PID或None)
+        self._pid_status_cache: Dict[str, Tuple[float, Optional[int]]] = {}
+        self._pid_status_lock = threading.Lock()
+        # 网卡 -> 已知的监控进程PID，命中时无需再读取PID文件；PID文件保留用于服务重启后恢复
+        self._pids: Dict[str, int] = {}
+
         # 启动时清理无效的PID文件
         self.cleanup_stale_pids()
 
@@ -48,21 +58,11 @@ class NTPMonitorManager:
         Returns:
             bool: True表示正在监控，False表示未监控
         """
-        pid_file = self.get_pid_file(interface)
-        if not pid_file.exists():
-            return False
-
-        try:
-            with open(pid_file, 'r') as f:
-                pid = int(f.read().strip())
-            return psutil.pid_exists(pid)
-        except (ValueError, IOError) as e:
-            logger.warning(f"读取PID文件失败 {pid_file}: {e}")
-            return False
+        return self.get_monitoring_pid(interface) is not None
 
     def get_monitoring_pid(self, interface: str) -> Optional[int]:
         """
-        获取监控进程的PID
+        获取监控进程的PID，PID_STATUS_CACHE_TTL_SECONDS 内重复查询时复用上次的检查结果
 
         Args:
             interface: 网卡名称
@@ -70,19 +70,60 @@ class NTPMonitorManager:
         Returns:
             Optional[int]: 进程PID，如果进程不存在返回None
         """
-        pid_file = self.get_pid_file(interface)
-        if not pid_file.exists():
-            return None
-
+        now = time.monotonic()
+        with self._pid_status_lock:
+            cached = self._pid_status_cache.get(interface)
+        if cached is not None and now - cached[0] < PID_STATUS_CACHE_TTL_SECONDS:
+            return cached[1]
+
+        pid = self._read_live_pid(interface)
+        with self._pid_status_lock:
+            self._pid_status_cache[interface] = (now, pid)
+        return pid
+
+    @staticmethod
+    def _process_alive(pid: int) -> bool:
+        """通过 kill(pid, 0) 探测进程是否存在，只需一次系统调用"""
         try:
-            with open(pid_file, 'r') as f:
-                pid = int(f.read().strip())
-            if psutil.pid_exists(pid):
-                return pid
-        except (ValueError, IOError) as e:
-            logger.warning(f"读取PID文件失败 {pid_file}: {e}")
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            # 进程存在但属于其他用户
+            return True
+        return True
+
+    def _read_live_pid(self, interface: str) -> Optional[int]:
+        """获取已知的PID（内存中没有时读取PID文件）并检查进程是否存活"""
+        with self._pid_status_lock:
+            pid = self._pids.get(interface)
+
+        if pid is None:
+            pid_file = self.get_pid_file(interface)
+            try:
+                with open(pid_file, 'r') as f:
+                    pid = int(f.read().strip())
+            except FileNotFoundError:
+                return None
+            except (ValueError, IOError) as e:
+                logger.warning(f"读取PID文件失败 {pid_file}: {e}")
+                return None
+
+        if self._process_alive(pid):
+            with self._pid_status_lock:
+                self._pids[interface] = pid
+            return pid
+
+        with self._pid_status_lock:
+            self._pids.pop(interface, None)
         return None
 
+    def _invalidate_pid_status(self, interface: str) -> None:
+        """启动、停止监控或删除PID文件后清除缓存的进程状态"""
+        with self._pid_status_lock:
+            self._pid_status_cache.pop(interface, None)
+            self._pids.pop(interface, None)
+
     def check_interface_exists(self, interface: str) -> bool:
         """
         检查网卡是否存在
@@ -93,17 +134,13 @@ class NTPMonitorManager:
         Returns:
             bool: True表示网卡存在，False表示不存在
         """
-        try:
-            result = subprocess.run(['ip', 'link', 'show', interface],
-                                    capture_output=True, text=True, timeout=5)
-            return result.returncode == 0
-        except subprocess.TimeoutExpired:
-            logger.error(f"检查网卡 {interface} 超时")
-            return False
-        except Exception as e:
-            logger.error(f"检查网卡 {interface} 失败: {e}")
+        # 网卡名不能包含路径分隔符，避免拼接出/sys/class/net之外的路径
+        if not interface or '/' in interface or interface in ('.', '..'):
             return False
 
+        # 直接检查sysfs目录，无需为每次状态查询启动ip命令子进程
+        return os.path.isdir(os.path.join(config.NETWORK_INTERFACES_SYS_PATH, interface))
+
     def start_monitoring(self, interface: str, port: int = 123, timeout: float = 2.0,
                          output_file: Optional[str] = None) -> Tuple[bool, str]:
         """
@@ -160,6 +197,9 @@ class NTPMonitorManager:
             pid_file = self.get_pid_file(interface)
             with open(pid_file, 'w') as f:
                 f.write(str(process.pid))
+            self._invalidate_pid_status(interface)
+            with self._pid_status_lock:
+                self._pids[interface] = process.pid
 
             # 等待一下确保进程正常启动
             time.sleep(1)
@@ -211,12 +251,12 @@ class NTPMonitorManager:
 
             # 等待进程结束
             for _ in range(50):  # 最多等待5秒
-                if not psutil.pid_exists(pid):
+                if not self._process_alive(pid):
                     break
                 time.sleep(0.1)
 
             # 如果进程还在运行，强制杀死
-            if psutil.pid_exists(pid):
+            if self._process_alive(pid):
                 logger.warning(f"进程 {pid} 未响应SIGTERM，发送SIGKILL")
                 os.kill(pid, signal.SIGKILL)
                 time.sleep(0.5)
@@ -225,6 +265,7 @@ class NTPMonitorManager:
             pid_file = self.get_pid_file(interface)
             if pid_file.exists():
                 pid_file.unlink()
+            self._invalidate_pid_status(interface)
 
             logger.info(f"网卡 {interface} 监控已停止")
             return True, f"网卡 {interface} 监控已停止"
@@ -234,6 +275,7 @@ class NTPMonitorManager:
             pid_file = self.get_pid_file(interface)
             if pid_file.exists():
                 pid_file.unlink()
+            self._invalidate_pid_status(interface)
             return True, f"网卡 {interface} 监控进程已停止"
         except PermissionError:
             return False, f"权限不足，无法停止进程 {pid}"
@@ -312,6 +354,7 @@ class NTPMonitorManager:
                 pid_file = self.get_pid_file(interface)
                 if pid_file.exists():
                     pid_file.unlink()
+                self._invalidate_pid_status(interface)
         else:
             status['status'] = 'not_monitoring'
 
@@ -352,6 +395,7 @@ class NTPMonitorManager:
             if not self.is_monitoring(interface):
                 try:
                     pid_file.unlink()
+                    self._invalidate_pid_status(interface)
                     cleaned_count += 1
                     logger.info(f"清理无效PID文件: {pid_file}")
                 except Exception as e:
@@ -1,16 +1,82 @@
+import atexit
 import os
+import socket
+import time
 import logging
+import threading
 from typing import List, Dict, Any, Tuple, Optional
 from utils.command_executor import execute_command
+from utils.netlink import NETLINK_AVAILABLE, dump_all_routes
 from models.network_models import Route
 import config
 
 logger = logging.getLogger(__name__)
 
+# get_active_routes() dumps both routing tables per call; share the result between calls this close together
+ACTIVE_ROUTES_CACHE_TTL_SECONDS = 0.5
+_active_routes_cache: Optional[Tuple[float, Dict[str, List[Route]]]] = None
+_active_routes_lock = threading.Lock()
+
+# Interfaces appear and disappear rarely, and sysfs does not report changes through inotify,
+# so the discovered list is simply reused for a short time
+INTERFACE_DISCOVERY_CACHE_TTL_SECONDS = 2.0
+_interfaces_cache: Optional[Tuple[float, List[str]]] = None
+_interfaces_lock = threading.Lock()
+_excluded_interfaces = frozenset(config.EXCLUDED_INTERFACES)
+
+# Route types excluded as destinations, compared against the lowercased destination
+_EXCLUDED_ROUTE_DESTINATIONS = frozenset((
+    'multicast', 'broadcast', 'local', 'unreachable', 'prohibit', 'blackhole', 'throw'
+))
+
+# Gateway values that mark a route as excluded, compared against the lowercased gateway
+_EXCLUDED_ROUTE_GATEWAYS = frozenset(('none', '', '0.0.0.0', '::', 'null'))
+
+# Destination prefixes excluded from active routes: IPv6 link-local and multicast ranges
+_EXCLUDED_ROUTE_PREFIXES = ('fe80::/64', '224.0.0.0/', 'ff00::/')
+
+# Keywords in 'ip route show' output that are followed by a value, skipped together with
+# that value so the value is never mistaken for 'via' or 'dev'
+_IP_ROUTE_KEYWORDS_WITH_VALUE = frozenset(('proto', 'scope', 'metric', 'mtu', 'table', 'src', 'pref'))
+
+# Host-route addresses excluded from active routes
+_LOOPBACK_ADDRESSES = frozenset(('127.0.0.1', '::1'))
+_LINK_LOCAL_PREFIXES = ('169.254.', 'fe80:')
+
+# Link status is polled for every interface on each listing, so the sysfs attribute files
+# stay open and are re-read in place with pread() instead of a stat/open/read/close per call.
+# Keyed by (interface_name, attribute); the lock also covers the pread so a descriptor is
+# never closed while another thread is reading it.
+_sysfs_attr_fds: Dict[Tuple[str, str], int] = {}
+_sysfs_attr_lock = threading.Lock()
+
+# Interface name -> negotiated speed in Mbps, dropped whenever the link is seen not 'up';
+# modified only under _sysfs_attr_lock, which also prunes it together with the descriptors
+_interface_speeds: Dict[str, int] = {}
+
 
 def discover_network_interfaces() -> List[str]:
     """
-    Discover network interfaces from the system.
+    Discover network interfaces from the system, reusing the previous result if it is
+    younger than INTERFACE_DISCOVERY_CACHE_TTL_SECONDS.
+
+    Returns:
+        List[str]: List of interface names
+    """
+    global _interfaces_cache
+
+    with _interfaces_lock:
+        now = time.monotonic()
+        if _interfaces_cache is None or now - _interfaces_cache[0] >= INTERFACE_DISCOVERY_CACHE_TTL_SECONDS:
+            _interfaces_cache = (now, _load_network_interfaces())
+        cached_interfaces = _interfaces_cache[1]
+
+    return list(cached_interfaces)
+
+
+def _load_network_interfaces() -> List[str]:
+    """
+    Read network interfaces from /sys/class/net/.
 
     Returns:
         List[str]: List of interface names
@@ -19,19 +85,99 @@ def discover_network_interfaces() -> List[str]:
 
     try:
         # Read network interfaces from /sys/class/net/
-        for interface in os.listdir(config.NETWORK_INTERFACES_SYS_PATH):
-            if interface not in config.EXCLUDED_INTERFACES:
+        present_interfaces = os.listdir(config.NETWORK_INTERFACES_SYS_PATH)
+        for interface in present_interfaces:
+            if interface not in _excluded_interfaces:
                 interfaces.append(interface)
+        _prune_sysfs_attr_fds(present_interfaces)
     except Exception as e:
         logger.exception("Error discovering network interfaces")
 
     return interfaces
 
 
+def _prune_sysfs_attr_fds(present_interfaces: List[str]) -> None:
+    """
+    Close the cached sysfs descriptors of interfaces that no longer exist.
+
+    Removed interfaces are usually never polled again, so their descriptors would otherwise
+    stay open for the life of the process (e.g. with veth/docker interfaces coming and going).
+
+    Args:
+        present_interfaces: Names of all interfaces currently listed in /sys/class/net/
+    """
+    present = set(present_interfaces)
+    with _sysfs_attr_lock:
+        for key in [key for key in _sysfs_attr_fds if key[0] not in present]:
+            os.close(_sysfs_attr_fds.pop(key))
+        for interface_name in [name for name in _interface_speeds if name not in present]:
+            del _interface_speeds[interface_name]
+
+
+@atexit.register
+def _close_sysfs_attr_fds() -> None:
+    """Close all cached sysfs descriptors."""
+    with _sysfs_attr_lock:
+        while _sysfs_attr_fds:
+            _, fd = _sysfs_attr_fds.popitem()
+            os.close(fd)
+
+
+def _read_sysfs_attr(interface_name: str, attr: str) -> Optional[str]:
+    """
+    Read a /sys/class/net/<interface>/<attr> attribute through a cached file descriptor.
+
+    Args:
+        interface_name: Name of the interface
+        attr: Attribute file name, e.g. 'operstate'
+
+    Returns:
+        Optional[str]: Stripped attribute value, None if the attribute does not exist
+
+    Raises:
+        OSError: If the attribute exists but cannot be read
+    """
+    key = (interface_name, attr)
+    with _sysfs_attr_lock:
+        fd = _sysfs_attr_fds.get(key)
+        if fd is None:
+            try:
+                fd = os.open(os.path.join(config.NETWORK_INTERFACES_SYS_PATH, interface_name, attr), os.O_RDONLY)
+            except FileNotFoundError:
+                return None
+            _sysfs_attr_fds[key] = fd
+
+        try:
+            return os.pread(fd, 64, 0).decode().strip()
+        except OSError:
+            # e.g. ENODEV once the interface is removed; reopen on the next call
+            del _sysfs_attr_fds[key]
+            os.close(fd)
+            raise
+
+
 def get_interface_link_status(interface_name: str) -> str:
     """
     Get the link status of a network interface.
 
+    Args:
+        interface_name: Name of the interface
+
+    Returns:
+        str: Link status ('up', 'down', 'no-carrier', 'unknown')
+    """
+    status = _read_link_status(interface_name)
+    if status != 'up':
+        # The link will renegotiate its speed when it comes back up
+        with _sysfs_attr_lock:
+            _interface_speeds.pop(interface_name, None)
+    return status
+
+
+def _read_link_status(interface_name: str) -> str:
+    """
+    Read the link status of a network interface from sysfs, falling back to 'ip link show'.
+
     Args:
         interface_name: Name of the interface
 
@@ -40,29 +186,24 @@ def get_interface_link_status(interface_name: str) -> str:
     """
     try:
         # 检查接口是否启用
-        operstate_path = f"/sys/class/net/{interface_name}/operstate"
-        if os.path.exists(operstate_path):
-            with open(operstate_path, 'r') as f:
-                operstate = f.read().strip()
-
+        operstate = _read_sysfs_attr(interface_name, 'operstate')
+        if operstate is not None:
             # 如果接口未启用，直接返回down
             if operstate == 'down':
                 return 'down'
 
             # 检查carrier状态（链路是否连通）
-            carrier_path = f"/sys/class/net/{interface_name}/carrier"
-            if os.path.exists(carrier_path):
-                try:
-                    with open(carrier_path, 'r') as f:
-                        carrier = f.read().strip()
-
-                    if carrier == '1':
-                        return 'up'  # 链路正常
-                    else:
-                        return 'no-carrier'  # 链路断开（网线未插好）
-                except (OSError, IOError):
-                    # carrier文件可能在接口down的时候无法读取
-                    return 'no-carrier'
+            try:
+                carrier = _read_sysfs_attr(interface_name, 'carrier')
+            except (OSError, IOError):
+                # carrier文件可能在接口down的时候无法读取
+                return 'no-carrier'
+
+            if carrier is not None:
+                if carrier == '1':
+                    return 'up'  # 链路正常
+                else:
+                    return 'no-carrier'  # 链路断开（网线未插好）
 
             # 如果无法读取carrier，根据operstate判断
             if operstate == 'up':
@@ -73,7 +214,7 @@ def get_interface_link_status(interface_name: str) -> str:
                 return 'no-carrier'
 
         # 如果无法读取operstate，使用ip命令检查
-        success, output, _ = execute_command(f"ip link show {interface_name}")
+        success, output, _ = execute_command(["ip", "link", "show", interface_name])
         if success and output:
             if 'state UP' in output:
                 return 'up'
@@ -94,22 +235,31 @@ def get_interface_speed(interface_name: str) -> Optional[int]:
     """
     Get the speed of a network interface in Mbps.
 
+    The speed only changes when the link is renegotiated, so it is cached until
+    get_interface_link_status sees the interface leave the 'up' state.
+
     Args:
         interface_name: Name of the interface
 
     Returns:
         Optional[int]: Speed in Mbps, None if unavailable
     """
+    speed = _interface_speeds.get(interface_name)
+    if speed is not None:
+        return speed
+
     try:
-        speed_path = f"/sys/class/net/{interface_name}/speed"
-        if os.path.exists(speed_path):
-            with open(speed_path, 'r') as f:
-                speed = f.read().strip()
-                return int(speed)
+        value = _read_sysfs_attr(interface_name, 'speed')
+        if value is not None:
+            speed = int(value)
     except (OSError, IOError, ValueError):
         pass
 
-    return None
+    # Links without a negotiated speed report -1; only cache real values
+    if speed is not None and speed > 0:
+        with _sysfs_attr_lock:
+            _interface_speeds[interface_name] = speed
+    return speed
 
 
 def should_exclude_route(destination: str, gateway: Optional[str], dev: Optional[str]) -> bool:
@@ -124,50 +274,26 @@ def should_exclude_route(destination: str, gateway: Optional[str], dev: Optional
     Returns:
         bool: True if route should be excluded
     """
-    # 排除的目标网络模式
-    excluded_destinations = [
-        'multicast',
-        'broadcast',
-        'local',
-        'unreachable',
-        'prohibit',
-        'blackhole',
-        'throw'
-    ]
-
-    # 排除的网关值
-    excluded_gateways = [
-        'None',
-        '',
-        '0.0.0.0',
-        '::',
-        'null'
-    ]
-
-    # 1. 排除特定的目标网络
-    if destination.lower() in excluded_destinations:
-        return True
-
-    # 2. 排除链路本地路由 (IPv6)
-    if destination.startswith('fe80::/64'):
+    # 1. 排除链路本地路由 (IPv6) 和组播地址范围的路由（前缀检查无需先转换大小写）
+    if destination.startswith(_EXCLUDED_ROUTE_PREFIXES):
         return True
 
-    # 3. 排除组播地址范围的路由
-    if destination.startswith('224.0.0.0/') or destination.startswith('ff00::/'):
+    # 2. 排除特定的目标网络
+    if destination.lower() in _EXCLUDED_ROUTE_DESTINATIONS:
         return True
 
-    # 4. 排除网关为None或空的路由（除了直连路由）
-    if gateway and gateway.lower() in [g.lower() for g in excluded_gateways]:
+    # 3. 排除网关为None或空的路由（除了直连路由）
+    if gateway and gateway.lower() in _EXCLUDED_ROUTE_GATEWAYS:
         return True
 
-    # 5. 排除主机路由中的特殊地址
+    # 4. 排除主机路由中的特殊地址
     if '/32' in destination or '/128' in destination:
         ip_part = destination.split('/')[0]
         # 排除本地地址
-        if ip_part in ['127.0.0.1', '::1']:
+        if ip_part in _LOOPBACK_ADDRESSES:
             return True
         # 排除链路本地地址
-        if ip_part.startswith('169.254.') or ip_part.startswith('fe80:'):
+        if ip_part.startswith(_LINK_LOCAL_PREFIXES):
             return True
 
     return False
@@ -175,44 +301,43 @@ def should_exclude_route(destination: str, gateway: Optional[str], dev: Optional
 
 def get_active_routes() -> Dict[str, List[Route]]:
     """
-    Get active routes from the system using 'ip route show' command.
+    Get active routes from the system, reusing the previous result if it is
+    younger than ACTIVE_ROUTES_CACHE_TTL_SECONDS.
 
     Returns:
         Dict[str, List[Route]]: Dictionary mapping interface names to their active routes
     """
-    interface_routes = {}
+    global _active_routes_cache
 
-    # Get IPv4 routes
-    success, output, _ = execute_command(config.IP_ROUTE_CMD)
-    if success and output:
-        for line in output.split('\n'):
-            if not line.strip():
-                continue
+    with _active_routes_lock:
+        now = time.monotonic()
+        if _active_routes_cache is None or now - _active_routes_cache[0] >= ACTIVE_ROUTES_CACHE_TTL_SECONDS:
+            _active_routes_cache = (now, _load_active_routes())
+        cached_routes = _active_routes_cache[1]
 
-            # Parse route line
-            parts = line.split()
-            if not parts:
-                continue
-
-            destination = parts[0]
+    # Hand out fresh lists so callers cannot modify the cached result
+    return {dev: list(routes) for dev, routes in cached_routes.items()}
 
-            # Handle default routes
-            if destination == 'default':
-                destination = '0.0.0.0/0'
 
-            # Find gateway and device
-            gateway = None
-            dev = None
+def _load_active_routes() -> Dict[str, List[Route]]:
+    """
+    Load active IPv4 and IPv6 routes from the system.
 
-            for i, part in enumerate(parts):
-                if part == 'via' and i + 1 < len(parts):
-                    gateway = parts[i + 1]
-                elif part == 'dev' and i + 1 < len(parts):
-                    dev = parts[i + 1]
+    Returns:
+        Dict[str, List[Route]]: Dictionary mapping interface names to their active routes
+    """
+    interface_routes = {}
+    routes_by_family = _list_routes()
 
+    for family, default_destination, family_name in ((socket.AF_INET, '0.0.0.0/0', 'IPv4'),
+                                                     (socket.AF_INET6, '::/0', 'IPv6')):
+        for destination, gateway, dev in routes_by_family[family]:
+            # Handle default routes; they are always kept, so the exclusion rules are skipped
+            if destination == 'default':
+                destination = default_destination
             # Skip routes that should be excluded
-            if should_exclude_route(destination, gateway, dev):
-                logger.debug(f"Excluding IPv4 route: {destination} via {gateway} dev {dev}")
+            elif should_exclude_route(destination, gateway, dev):
+                logger.debug(f"Excluding {family_name} route: {destination} via {gateway} dev {dev}")
                 continue
 
             if dev:
@@ -221,46 +346,65 @@ def get_active_routes() -> Dict[str, List[Route]]:
                     interface_routes[dev] = []
                 interface_routes[dev].append(route)
 
-    # Get IPv6 routes
-    success, output, _ = execute_command(config.IP_ROUTE6_CMD)
+    return interface_routes
+
+
+def _list_routes() -> Dict[int, List[Tuple[str, Optional[str], Optional[str]]]]:
+    """
+    List the main-table IPv4 and IPv6 routes, dumped over rtnetlink in one request when
+    available and parsed from the ip command output otherwise.
+
+    Returns:
+        Dict[int, List[Tuple[str, Optional[str], Optional[str]]]]: (destination, gateway, dev)
+        per route, keyed by socket.AF_INET and socket.AF_INET6
+    """
+    if NETLINK_AVAILABLE:
+        try:
+            return dump_all_routes()
+        except OSError as e:
+            logger.warning(f"Netlink route dump failed, falling back to ip command: {e}")
+
+    return {family: _list_routes_from_ip_command(family) for family in (socket.AF_INET, socket.AF_INET6)}
+
+
+def _list_routes_from_ip_command(family: int) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    List routes using the 'ip route show' / 'ip -6 route show' command.
+
+    Args:
+        family: socket.AF_INET or socket.AF_INET6
+
+    Returns:
+        List[Tuple[str, Optional[str], Optional[str]]]: (destination, gateway, dev) per route
+    """
+    routes = []
+
+    command = config.IP_ROUTE_CMD if family == socket.AF_INET else config.IP_ROUTE6_CMD
+    success, output, _ = execute_command(command)
     if success and output:
         for line in output.split('\n'):
-            if not line.strip():
-                continue
-
             # Parse route line
             parts = line.split()
             if not parts:
                 continue
 
-            destination = parts[0]
-
-            # Handle default routes
-            if destination == 'default':
-                destination = '::/0'
-
-            # Find gateway and device
+            # Find gateway and device in one pass, consuming each keyword's value with it
             gateway = None
             dev = None
 
-            for i, part in enumerate(parts):
-                if part == 'via' and i + 1 < len(parts):
-                    gateway = parts[i + 1]
-                elif part == 'dev' and i + 1 < len(parts):
-                    dev = parts[i + 1]
+            tokens = iter(parts)
+            destination = next(tokens)
+            for token in tokens:
+                if token == 'via':
+                    gateway = next(tokens, None)
+                elif token == 'dev':
+                    dev = next(tokens, None)
+                elif token in _IP_ROUTE_KEYWORDS_WITH_VALUE:
+                    next(tokens, None)
 
-            # Skip routes that should be excluded
-            if should_exclude_route(destination, gateway, dev):
-                logger.debug(f"Excluding IPv6 route: {destination} via {gateway} dev {dev}")
-                continue
+            routes.append((destination, gateway, dev))
 
-            if dev:
-                route = Route(destination=destination, gateway=gateway, dev=dev)
-                if dev not in interface_routes:
-                    interface_routes[dev] = []
-                interface_routes[dev].append(route)
-
-    return interface_routes
+    return routes
 
 
 def reload_networkd() -> Tuple[bool, Optional[str]]:
@@ -1,16 +1,20 @@
+import shlex
 import subprocess
 import logging
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional, Union
 
 logger = logging.getLogger(__name__)
 
 
-def execute_command(command: str) -> Tuple[bool, Optional[str], Optional[str]]:
+def execute_command(command: Union[str, List[str]]) -> Tuple[bool, Optional[str], Optional[str]]:
     """
     Execute a system command and return the result.
 
+    The command is run directly, without a shell: a string is split into arguments
+    with shlex, so shell features such as pipes or redirection are not available.
+
     Args:
-        command: The command to execute
+        command: The command to execute, as a string or an argument list
 
     Returns:
         Tuple containing:
@@ -20,20 +24,22 @@ def execute_command(command: str) -> Tuple[bool, Optional[str], Optional[str]]:
     """
     try:
         logger.debug(f"Executing command: {command}")
-        process = subprocess.Popen(
-            command,
-            shell=True,
+        args = shlex.split(command) if isinstance(command, str) else command
+        result = subprocess.run(
+            args,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             universal_newlines=True
         )
-        stdout, stderr = process.communicate()
 
-        if process.returncode == 0:
-            return True, stdout.strip(), None
+        if result.returncode == 0:
+            return True, result.stdout.strip(), None
         else:
-            logger.error(f"Command failed: {command}, Error: {stderr.strip()}")
-            return False, None, stderr.strip()
+            logger.error(f"Command failed: {command}, Error: {result.stderr.strip()}")
+            return False, None, result.stderr.strip()
+    except FileNotFoundError as e:
+        logger.error(f"Command not found: {command}")
+        return False, None, str(e)
     except Exception as e:
         logger.exception(f"Exception executing command: {command}")
-        return False, None, str(e)
\ No newline at end of file
+        return False, None, str(e)
@@ -1,20 +1,25 @@
-import re
 import os
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from models.network_models import NetworkInterface, Route
 
-# Regular expressions for parsing systemd-networkd configuration files
-MATCH_SECTION_REGEX = r'^\[Match\]$((?:\n[^[]+)*)'
-NETWORK_SECTION_REGEX = r'^\[Network\]$((?:\n[^[]+)*)'
-ROUTE_SECTION_REGEX = r'^\[Route\]$((?:\n[^[]+)*)'
-DHCP_SECTION_REGEX = r'^\[DHCP\]$((?:\n[^[]+)*)'
-ADDRESS_REGEX = r'Address\s*=\s*(.+)'
-GATEWAY_REGEX = r'Gateway\s*=\s*(.+)'
-DNS_REGEX = r'DNS\s*=\s*(.+)'
-NAME_REGEX = r'Name\s*=\s*(.+)'
-DESTINATION_REGEX = r'Destination\s*=\s*(.+)'
+# Route types excluded as destinations, compared against the lowercased destination
+_EXCLUDED_ROUTE_DESTINATIONS = frozenset((
+    'multicast', 'broadcast', 'local', 'unreachable', 'prohibit', 'blackhole', 'throw'
+))
 
+# Gateway values that mark a route as excluded, compared against the lowercased gateway
+_EXCLUDED_ROUTE_GATEWAYS = frozenset(('none', '', '0.0.0.0', '::', 'null'))
 
+# Lowercased destination prefixes excluded from user configuration: multicast, loopback
+# and link-local ranges (fe80::/ also covers fe80::/64)
+_EXCLUDED_ROUTE_PREFIXES = ('224.0.0.0/', 'ff00::/', '127.0.0.0/', '::1/', '169.254.0.0/', 'fe80::/')
+
+# File path -> ((st_ino, st_mtime_ns, st_size), parse result), see parse_network_file
+_parsed_network_files: Dict[str, Tuple[Tuple[int, int, int], Tuple[Optional[str], Optional[Dict]]]] = {}
+
+
+@lru_cache(maxsize=1024)
 def should_exclude_systemd_route(destination: str, gateway: str) -> bool:
     """
     Determine if a systemd-networkd route should be excluded from user configuration.
@@ -26,48 +31,18 @@ def should_exclude_systemd_route(destination: str, gateway: str) -> bool:
     Returns:
         bool: True if route should be excluded
     """
-    # 排除的目标网络模式
-    excluded_destinations = [
-        'multicast',
-        'broadcast',
-        'local',
-        'unreachable',
-        'prohibit',
-        'blackhole',
-        'throw'
-    ]
-
-    # 排除的网关值
-    excluded_gateways = [
-        'none',
-        '',
-        '0.0.0.0',
-        '::',
-        'null'
-    ]
+    destination_lower = destination.lower()
 
     # 1. 排除特定的目标网络（不区分大小写）
-    if destination.lower() in excluded_destinations:
-        return True
-
-    # 2. 排除IPv6链路本地路由
-    if destination.lower().startswith('fe80::/64'):
-        return True
-
-    # 3. 排除组播地址范围的路由
-    if destination.startswith('224.0.0.0/') or destination.lower().startswith('ff00::/'):
+    if destination_lower in _EXCLUDED_ROUTE_DESTINATIONS:
         return True
 
-    # 4. 排除网关为None或空的特殊路由
-    if gateway and gateway.lower() in excluded_gateways:
+    # 2. 排除网关为None或空的特殊路由
+    if gateway and gateway.lower() in _EXCLUDED_ROUTE_GATEWAYS:
         return True
 
-    # 5. 排除本地环回相关路由
-    if destination.startswith('127.0.0.0/') or destination.lower().startswith('::1/'):
-        return True
-
-    # 6. 排除链路本地地址路由
-    if destination.startswith('169.254.0.0/') or destination.lower().startswith('fe80::/'):
+    # 3. 排除组播、本地环回和链路本地地址范围的路由
+    if destination_lower.startswith(_EXCLUDED_ROUTE_PREFIXES):
         return True
 
     return False
@@ -77,6 +52,9 @@ def parse_network_file(file_path: str) -> Tuple[Optional[str], Optional[Dict]]:
     """
     Parse a systemd-networkd .network file and extract network configuration.
 
+    Results are cached per file and reused while the file's inode, mtime and size
+    are unchanged; each call returns its own copy of the configuration.
+
     Args:
         file_path: Path to the .network file
 
@@ -86,20 +64,63 @@ def parse_network_file(file_path: str) -> Tuple[Optional[str], Optional[Dict]]:
         - Optional[Dict]: Dictionary with extracted configuration if successful, None otherwise
     """
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
+        st = os.stat(file_path)
+    except OSError:
+        _parsed_network_files.pop(file_path, None)
+        return None, None
 
-        # Extract interface name from Match section
-        match_section = re.search(MATCH_SECTION_REGEX, content, re.MULTILINE)
-        if not match_section:
-            return None, None
+    file_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    cached = _parsed_network_files.get(file_path)
+    if cached is None or cached[0] != file_key:
+        cached = (file_key, _parse_network_file_content(file_path))
+        _parsed_network_files[file_path] = cached
+
+    interface_name, config = cached[1]
+    return interface_name, _copy_network_config(config)
+
+
+def forget_parsed_network_file(file_path: str) -> None:
+    """
+    Drop the cached parse of a file, e.g. right after rewriting it in place.
+
+    Args:
+        file_path: Path to the .network file
+    """
+    _parsed_network_files.pop(file_path, None)
 
-        match_content = match_section.group(1)
-        name_match = re.search(NAME_REGEX, match_content, re.MULTILINE)
-        if not name_match:
-            return None, None
 
-        interface_name = name_match.group(1).strip()
+def _copy_network_config(config: Optional[Dict]) -> Optional[Dict]:
+    """Copy a parsed configuration so callers cannot modify the cached one."""
+    if config is None:
+        return None
+
+    return {
+        'ipv4_addresses': list(config['ipv4_addresses']),
+        'ipv6_addresses': list(config['ipv6_addresses']),
+        'ipv4_gateway': config['ipv4_gateway'],
+        'ipv6_gateway': config['ipv6_gateway'],
+        'dns': list(config['dns']),
+        'systemd_networkd_routes': [dict(route) for route in config['systemd_networkd_routes']]
+    }
+
+
+def _parse_network_file_content(file_path: str) -> Tuple[Optional[str], Optional[Dict]]:
+    """
+    Read and parse a .network file.
+
+    The file is read in a single pass, tracking the current section and matching
+    keys exactly; comment lines ('#' or ';') are ignored as systemd does.
+
+    Args:
+        file_path: Path to the .network file
+
+    Returns:
+        Tuple containing:
+        - Optional[str]: Interface name if found, None otherwise
+        - Optional[Dict]: Dictionary with extracted configuration if successful, None otherwise
+    """
+    try:
+        interface_name = None
 
         # Initialize config dictionary
         config = {
@@ -111,64 +132,90 @@ def parse_network_file(file_path: str) -> Tuple[Optional[str], Optional[Dict]]:
             'systemd_networkd_routes': []
         }
 
-        # Extract network section
-        network_section = re.search(NETWORK_SECTION_REGEX, content, re.MULTILINE)
-        if network_section:
-            network_content = network_section.group(1)
-
-            # Extract addresses
-            for addr_match in re.finditer(ADDRESS_REGEX, network_content, re.MULTILINE):
-                address = addr_match.group(1).strip()
-                if ':' in address:  # IPv6
-                    config['ipv6_addresses'].append(address)
-                else:  # IPv4
-                    config['ipv4_addresses'].append(address)
-
-            # Extract gateways
-            for gateway_match in re.finditer(GATEWAY_REGEX, network_content, re.MULTILINE):
-                gateway = gateway_match.group(1).strip()
-                if ':' in gateway:  # IPv6
-                    config['ipv6_gateway'] = gateway
-                else:  # IPv4
-                    config['ipv4_gateway'] = gateway
-
-            # Extract DNS servers
-            for dns_match in re.finditer(DNS_REGEX, network_content, re.MULTILINE):
-                dns_servers = dns_match.group(1).strip().split()
-                config['dns'].extend(dns_servers)
-
-        # Extract routes with filtering
-        route_sections = re.finditer(r'\[Route\](?:\n[^[]+)*', content, re.MULTILINE)
-        for route_section in route_sections:
-            route_content = route_section.group(0)
-
-            destination_match = re.search(DESTINATION_REGEX, route_content, re.MULTILINE)
-            gateway_match = re.search(GATEWAY_REGEX, route_content, re.MULTILINE)
-
-            if destination_match and gateway_match:
-                destination = destination_match.group(1).strip()
-                gateway = gateway_match.group(1).strip()
-
-                # 过滤掉不应该显示给用户的路由
-                if should_exclude_systemd_route(destination, gateway):
+        section = None
+        # Destination/Gateway of the [Route] section being read
+        route = None
+
+        with open(file_path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line[0] in '#;':
                     continue
 
-                config['systemd_networkd_routes'].append({
-                    'destination': destination,
-                    'gateway': gateway
-                })
+                if line[0] == '[':
+                    _add_systemd_route(config, route)
+                    section = line
+                    route = {} if section == '[Route]' else None
+                    continue
+
+                key, sep, value = line.partition('=')
+                value = value.strip()
+                if not sep or not value:
+                    continue
+                key = key.strip()
+
+                if section == '[Network]':
+                    if key == 'Address':
+                        if ':' in value:  # IPv6
+                            config['ipv6_addresses'].append(value)
+                        else:  # IPv4
+                            config['ipv4_addresses'].append(value)
+                    elif key == 'Gateway':
+                        if ':' in value:  # IPv6
+                            config['ipv6_gateway'] = value
+                        else:  # IPv4
+                            config['ipv4_gateway'] = value
+                    elif key == 'DNS':
+                        config['dns'].extend(value.split())
+                elif section == '[Route]':
+                    if key == 'Destination' or key == 'Gateway':
+                        route.setdefault(key, value)
+                elif section == '[Match]':
+                    if key == 'Name' and interface_name is None:
+                        interface_name = value
+
+        _add_systemd_route(config, route)
+
+        if interface_name is None:
+            return None, None
 
         return interface_name, config
     except Exception as e:
         return None, None
 
 
-def generate_network_config(interface: NetworkInterface) -> str:
+def _add_systemd_route(config: Dict, route: Optional[Dict[str, str]]) -> None:
+    """
+    Add a parsed [Route] section to the configuration unless it is incomplete or excluded.
+
+    Args:
+        config: Configuration dictionary being built by parse_network_file
+        route: Destination/Gateway values of the section, None if the section was not [Route]
+    """
+    if not route or 'Destination' not in route or 'Gateway' not in route:
+        return
+
+    destination = route['Destination']
+    gateway = route['Gateway']
+
+    # 过滤掉不应该显示给用户的路由
+    if should_exclude_systemd_route(destination, gateway):
+        return
+
+    config['systemd_networkd_routes'].append({
+        'destination': destination,
+        'gateway': gateway
+    })
+
+
+def generate_network_config(interface: NetworkInterface, routes_prefiltered: bool = False) -> str:
     """
     Generate systemd-networkd configuration file content for a network interface.
 
     Args:
         interface: NetworkInterface object containing configuration data
+        routes_prefiltered: True if the caller already dropped routes excluded by
+            should_exclude_systemd_route, so they are written without checking again
 
     Returns:
         str: Generated configuration file content
@@ -200,8 +247,8 @@ def generate_network_config(interface: NetworkInterface) -> str:
 
     # Add routes (只添加用户配置的路由，不包括系统自动生成的路由)
     for route in interface.systemd_networkd_routes:
-        # 在生成配置时也进行过滤，确保不写入不应该的路由
-        if not should_exclude_systemd_route(route.destination, route.gateway):
+        # 在生成配置时也进行过滤（调用方已过滤时跳过），确保不写入不应该的路由
+        if routes_prefiltered or not should_exclude_systemd_route(route.destination, route.gateway):
             config_content.extend([
                 "",
                 "[Route]",
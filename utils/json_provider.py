@@ -0,0 +1,52 @@
+from typing import Any
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; Flask's default provider is used without it
+    orjson = None
+
+if orjson is not None:
+    # datetime/date/time and dataclasses are passed to the provider's default(), so they are
+    # rendered exactly as Flask's default provider renders them
+    _ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS |
+                       orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes responses with orjson.
+
+    Only response() (used by jsonify) is replaced; key sorting and debug-mode indentation
+    follow the same settings as the default provider. Values orjson cannot encode, such as
+    integers wider than 64 bits, fall back to the default provider.
+    """
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+
+        option = _ORJSON_OPTIONS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+
+        try:
+            body = orjson.dumps(obj, default=self.default, option=option)
+        except orjson.JSONEncodeError:
+            return super().response(*args, **kwargs)
+
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def install_json_provider(app) -> None:
+    """
+    Use OrjsonProvider for the application's JSON responses when orjson is installed.
+
+    Args:
+        app: Flask application
+    """
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -0,0 +1,186 @@
+import os
+import socket
+import struct
+from typing import Dict, List, Optional, Tuple
+
+# rtnetlink is Linux-only; callers fall back to the ip command when it is unavailable
+NETLINK_AVAILABLE = hasattr(socket, 'AF_NETLINK')
+
+# Constants from <linux/netlink.h> and <linux/rtnetlink.h>
+_NLMSG_ERROR = 2
+_NLMSG_DONE = 3
+_NLM_F_REQUEST = 0x1
+_NLM_F_DUMP = 0x300
+_RTM_NEWROUTE = 24
+_RTM_GETROUTE = 26
+_RT_TABLE_MAIN = 254
+_RTN_UNICAST = 1
+_RTA_DST = 1
+_RTA_OIF = 4
+_RTA_GATEWAY = 5
+_RTA_MULTIPATH = 9
+_RTA_TABLE = 15
+
+_NLMSGHDR = struct.Struct('=IHHII')
+_RTMSG = struct.Struct('=BBBBBBBBI')
+_RTATTR = struct.Struct('=HH')
+_RTNEXTHOP = struct.Struct('=HBBi')
+_TABLE_ID = struct.Struct('=I')
+_IFINDEX = struct.Struct('=i')
+
+_RECV_BUFFER_SIZE = 65536
+
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def _parse_attrs(data: bytes, offset: int, end: int) -> Dict[int, bytes]:
+    """
+    Parse a run of rtattr structures.
+
+    Args:
+        data: Message buffer
+        offset: Offset of the first attribute
+        end: Offset just past the last attribute
+
+    Returns:
+        Dict[int, bytes]: Attribute payloads keyed by attribute type
+    """
+    attrs = {}
+    while offset + _RTATTR.size <= end:
+        length, attr_type = _RTATTR.unpack_from(data, offset)
+        if length < _RTATTR.size:
+            break
+        attrs[attr_type] = data[offset + _RTATTR.size:offset + length]
+        offset += _align(length)
+    return attrs
+
+
+def _format_destination(family: int, dst: Optional[bytes], dst_len: int) -> str:
+    """Format a route destination the way 'ip route show' prints it."""
+    if dst_len == 0:
+        return 'default'
+    address = socket.inet_ntop(family, dst)
+    full_length = 32 if family == socket.AF_INET else 128
+    return address if dst_len == full_length else f"{address}/{dst_len}"
+
+
+def dump_routes(family: int) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Dump the unicast routes of the main routing table over rtnetlink.
+
+    Returns the same routes as 'ip route show' / 'ip -6 route show', without
+    spawning a process or parsing text. Multipath routes yield one entry per nexthop.
+
+    Args:
+        family: socket.AF_INET or socket.AF_INET6
+
+    Returns:
+        List[Tuple[str, Optional[str], Optional[str]]]: (destination, gateway, dev) per route,
+        destination formatted like the ip command ('default', '192.0.2.0/24', '10.0.0.1')
+
+    Raises:
+        OSError: If the netlink request fails
+    """
+    return _dump(family).get(family, [])
+
+
+def dump_all_routes() -> Dict[int, List[Tuple[str, Optional[str], Optional[str]]]]:
+    """
+    Dump the IPv4 and IPv6 unicast routes of the main routing table in a single
+    rtnetlink request.
+
+    Returns:
+        Dict[int, List[Tuple[str, Optional[str], Optional[str]]]]: (destination, gateway, dev)
+        per route as returned by dump_routes, keyed by socket.AF_INET and socket.AF_INET6
+
+    Raises:
+        OSError: If the netlink request fails
+    """
+    routes = _dump(socket.AF_UNSPEC)
+    return {family: routes.get(family, []) for family in (socket.AF_INET, socket.AF_INET6)}
+
+
+def _dump(family: int) -> Dict[int, List[Tuple[str, Optional[str], Optional[str]]]]:
+    """
+    Send one RTM_GETROUTE dump request and collect the routes by address family.
+
+    Args:
+        family: Address family to dump, socket.AF_UNSPEC for all of them
+
+    Returns:
+        Dict[int, List[Tuple[str, Optional[str], Optional[str]]]]: Routes keyed by address family
+    """
+    ifindex_names = dict(socket.if_nameindex())
+    routes = {}
+
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE) as sock:
+        request = _NLMSGHDR.pack(_NLMSGHDR.size + _RTMSG.size, _RTM_GETROUTE,
+                                 _NLM_F_REQUEST | _NLM_F_DUMP, 1, 0)
+        request += _RTMSG.pack(family, 0, 0, 0, 0, 0, 0, 0, 0)
+        sock.sendto(request, (0, 0))
+
+        while True:
+            data = sock.recv(_RECV_BUFFER_SIZE)
+            offset = 0
+            while offset + _NLMSGHDR.size <= len(data):
+                msg_len, msg_type, _, _, _ = _NLMSGHDR.unpack_from(data, offset)
+                if msg_len < _NLMSGHDR.size:
+                    return routes
+                if msg_type == _NLMSG_DONE:
+                    return routes
+                if msg_type == _NLMSG_ERROR:
+                    error = _IFINDEX.unpack_from(data, offset + _NLMSGHDR.size)[0]
+                    if error:
+                        raise OSError(-error, os.strerror(-error))
+                elif msg_type == _RTM_NEWROUTE:
+                    rtm_family = data[offset + _NLMSGHDR.size]
+                    if rtm_family in (socket.AF_INET, socket.AF_INET6):
+                        routes.setdefault(rtm_family, []).extend(
+                            _parse_route(data, offset + _NLMSGHDR.size, offset + msg_len,
+                                         rtm_family, ifindex_names))
+                offset += _align(msg_len)
+
+
+def _parse_route(data: bytes, offset: int, end: int, family: int,
+                 ifindex_names: Dict[int, str]) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Parse one RTM_NEWROUTE message body.
+
+    Returns:
+        List[Tuple[str, Optional[str], Optional[str]]]: (destination, gateway, dev) entries,
+        empty if the route is not a unicast route in the main table
+    """
+    _, dst_len, _, _, table, _, _, route_type, _ = _RTMSG.unpack_from(data, offset)
+    attrs = _parse_attrs(data, offset + _RTMSG.size, end)
+
+    # Table ids above 255 only fit in RTA_TABLE
+    if _RTA_TABLE in attrs:
+        table = _TABLE_ID.unpack(attrs[_RTA_TABLE])[0]
+    if table != _RT_TABLE_MAIN or route_type != _RTN_UNICAST:
+        return []
+
+    destination = _format_destination(family, attrs.get(_RTA_DST), dst_len)
+
+    if _RTA_MULTIPATH in attrs:
+        entries = []
+        nexthops = attrs[_RTA_MULTIPATH]
+        nh_offset = 0
+        while nh_offset + _RTNEXTHOP.size <= len(nexthops):
+            nh_len, _, _, ifindex = _RTNEXTHOP.unpack_from(nexthops, nh_offset)
+            if nh_len < _RTNEXTHOP.size:
+                break
+            nh_attrs = _parse_attrs(nexthops, nh_offset + _RTNEXTHOP.size, nh_offset + nh_len)
+            gateway = nh_attrs.get(_RTA_GATEWAY)
+            entries.append((destination,
+                            socket.inet_ntop(family, gateway) if gateway else None,
+                            ifindex_names.get(ifindex)))
+            nh_offset += _align(nh_len)
+        return entries
+
+    gateway = attrs.get(_RTA_GATEWAY)
+    oif = attrs.get(_RTA_OIF)
+    return [(destination,
+             socket.inet_ntop(family, gateway) if gateway else None,
+             ifindex_names.get(_IFINDEX.unpack(oif)[0]) if oif else None)]
@@ -11,12 +11,98 @@ import signal
 import re
 import json
 import time
+import socket
+import struct
+import functools
+import threading
 from datetime import datetime, timezone
-from collections import defaultdict
+from collections import defaultdict, OrderedDict, deque
+
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，未安装时使用标准库json
+    orjson = None
+
+# ip addr / tcpdump输出解析用的正则表达式，模块加载时编译一次，逐行解析时直接使用
+_INTERFACE_RE = re.compile(r'^\d+:\s+([^:]+):')
+_INET_RE = re.compile(r'inet\s+(\d+\.\d+\.\d+\.\d+)/(\d+)')
+_TIMESTAMP_RE = re.compile(r'(\d+:\d+:\d+\.\d+)')
+_CLIENT_RE = re.compile(r'(\d+\.\d+\.\d+\.\d+)\.(\d+) > (\d+\.\d+\.\d+\.\d+)\.123: NTPv(\d+), Client')
+_SERVER_RE = re.compile(r'(\d+\.\d+\.\d+\.\d+)\.123 > (\d+\.\d+\.\d+\.\d+)\.(\d+): NTPv(\d+), Server')
+_LENGTH_RE = re.compile(r'length (\d+)')
+_LEAP_RE = re.compile(r'Leap indicator: ([^,]+)')
+_LEAP_VALUE_RE = re.compile(r'\((\d+)\)')
+_STRATUM_RE = re.compile(r'Stratum (\d+) \(([^)]+)\)')
+_POLL_RE = re.compile(r'poll (\d+) \(([^)]+)\)')
+_PRECISION_RE = re.compile(r'precision (-?\d+)')
+_ROOT_RE = re.compile(r'Root Delay: ([0-9.]+), Root dispersion: ([0-9.]+)')
+_REFERENCE_ID_RE = re.compile(r'Reference-ID: ([^\s]+)')
+_NTP_TIMESTAMP_RES = (
+    ('reference_timestamp', re.compile(r'Reference Timestamp:\s+([0-9.]+)')),
+    ('originate_timestamp', re.compile(r'Originator Timestamp: ([0-9.]+)')),
+    ('receive_timestamp', re.compile(r'Receive Timestamp:\s+([0-9.]+)')),
+    ('transmit_timestamp', re.compile(r'Transmit Timestamp:\s+([0-9.]+)')),
+)
+
+# IPv4地址的32位整数形式（网络字节序），与socket.inet_aton/inet_ntoa配合转换
+_IPV4_INT = struct.Struct('!I')
+
+# 获取网卡信息（ip addr show）的超时时间（秒）
+INTERFACE_INFO_TIMEOUT = 10
+
+# IP到网卡查找结果的缓存条目数：NTP流量中客户端和本机服务器IP反复出现
+INTERFACE_LOOKUP_CACHE_SIZE = 4096
+
+# 需要过滤的虚拟网卡名称前缀（str.startswith接受元组，一次调用检查全部前缀）
+FILTERED_INTERFACE_PREFIXES = ('docker', 'br-', 'veth', 'virbr', 'vmnet')
+
+# IP不属于任何本机网段时的网卡信息（所有数据包共享同一个字典，不应修改）
+_UNKNOWN_IFACE = {'interface': 'unknown', 'local_ip': 'unknown', 'network': 'unknown'}
+
+# NTP纪元（1900-01-01）与Unix纪元（1970-01-01）相差的秒数
+NTP_EPOCH_OFFSET = 2208988800
+
+# 可读时间的缓存条目数：服务器的参考时间戳在大量会话中重复出现，
+# 同一会话中请求的发送时间戳与响应的发起时间戳也相同
+NTP_TIMESTAMP_CACHE_SIZE = 2048
+
+# 已完成会话在内存中累积到该条数后追加写入会话文件
+SESSION_FLUSH_SIZE = 100
+
+# 内存中保留的未匹配数据包条数上限，超出后丢弃最早的记录
+MAX_UNMATCHED_PACKETS = 10000
+
+
+def _dump_json_line(obj):
+    """将对象序列化为一行JSON（UTF-8编码，含结尾换行符）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _dump_json_document(obj):
+    """将对象序列化为缩进格式的JSON文档（UTF-8编码）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+@functools.lru_cache(maxsize=NTP_TIMESTAMP_CACHE_SIZE)
+def _format_ntp_timestamp(ntp_timestamp):
+    """将NTP时间戳转换为可读时间，结果按时间戳缓存"""
+    if ntp_timestamp == 0:
+        return "未设置"
+    try:
+        unix_timestamp = ntp_timestamp - NTP_EPOCH_OFFSET
+        dt = datetime.fromtimestamp(unix_timestamp, tz=timezone.utc)
+        return dt.strftime('%Y-%m-%d %H:%M:%S.%f UTC')[:-3]
+    except (ValueError, OSError):
+        return f"解析错误: {ntp_timestamp}"
 
 
 class PairedNTPAnalyzer:
-    def __init__(self, interface='any', port=123, output_file=None, pairing_timeout=2.0):
+    def __init__(self, interface='any', port=123, output_file=None, pairing_timeout=2.0,
+                 max_unmatched_packets=MAX_UNMATCHED_PACKETS):
         self.interface = interface
         self.port = port
         self.output_file = output_file
@@ -26,12 +112,26 @@ class PairedNTPAnalyzer:
         self.session_count = 0
 
         # 存储待配对的请求和响应
-        self.pending_requests = {}  # key: (client_ip, client_port) -> request_data
+        # key: (client_ip, client_port, server_ip) -> (到达时的单调时钟, request_data)，
+        # 按到达时间排序（最早的在前），清理超时请求时只需检查队首
+        self.pending_requests = OrderedDict()
+        # 尚未写入会话文件的已完成会话（仅指定输出文件时累积），写入后即释放
         self.completed_sessions = []
-        self.unmatched_packets = []
+        # 会话逐条写入JSONL文件（每行一个会话），输出文件只保存摘要
+        self.sessions_file = f"{output_file}.jsonl" if output_file else None
+        self._sessions_fh = None
+        # 只保留最近的max_unmatched_packets条未匹配数据包，unmatched_count为累计总数
+        self.unmatched_packets = deque(maxlen=max_unmatched_packets)
+        self.unmatched_count = 0
 
         # 网卡信息缓存
         self.interface_cache = {}
+        # 按前缀长度降序排列的网段列表 (prefix_len, network_int, mask, iface_info)，用于最长前缀匹配
+        # iface_info为预先构建的网卡信息字典，同一网段的所有数据包共享，不应修改
+        self.interface_networks = []
+        # 查找结果按IP缓存，网段列表重建时清空
+        self.determine_interface_for_ip = functools.lru_cache(maxsize=INTERFACE_LOOKUP_CACHE_SIZE)(
+            self.lookup_interface_for_ip)
         # 需要过滤的特殊网卡
         self.filtered_interfaces = {
             'lo', 'sit0', 'teql0', 'tunl0', 'gre0', 'gretap0',
@@ -42,11 +142,25 @@ class PairedNTPAnalyzer:
     def initialize_interface_info(self):
         """初始化网卡信息"""
         try:
-            # 获取网卡信息
-            result = subprocess.run(['ip', 'addr', 'show'],
-                                    capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                self.parse_interface_info(result.stdout)
+            # 获取网卡信息：边读取ip addr show的输出边逐行解析
+            command = ['ip', 'addr', 'show']
+            with subprocess.Popen(command, stdout=subprocess.PIPE,
+                                  stderr=subprocess.DEVNULL, text=True) as process:
+                # 逐行读取会阻塞到EOF，由定时器在超时后结束进程，读取随即结束
+                timer = threading.Timer(INTERFACE_INFO_TIMEOUT, process.kill)
+                timer.start()
+                try:
+                    self.parse_interface_info(process.stdout)
+                finally:
+                    timer.cancel()
+                returncode = process.wait()
+
+            if returncode != 0:
+                # 命令失败或超时被结束时，已解析的部分输出不可靠，丢弃
+                self.interface_cache = {}
+                self.build_interface_networks()
+                if returncode == -signal.SIGKILL:
+                    raise subprocess.TimeoutExpired(command, INTERFACE_INFO_TIMEOUT)
         except Exception as e:
             print(f"⚠️  获取网卡信息失败: {e}")
 
@@ -61,20 +175,15 @@ class PairedNTPAnalyzer:
             return True
 
         # 过滤以特定前缀开头的接口
-        filtered_prefixes = ['docker', 'br-', 'veth', 'virbr', 'vmnet']
-        for prefix in filtered_prefixes:
-            if interface_name.startswith(prefix):
-                return True
+        return interface_name.startswith(FILTERED_INTERFACE_PREFIXES)
 
-        return False
-
-    def parse_interface_info(self, ip_output):
-        """解析网卡信息"""
+    def parse_interface_info(self, ip_output_lines):
+        """解析网卡信息，ip_output_lines为ip addr show输出的行（可迭代对象，如进程的stdout）"""
         current_interface = None
 
-        for line in ip_output.split('\n'):
+        for line in ip_output_lines:
             # 解析网卡名称 (例如: "2: eth0: <BROADCAST,MULTICAST,UP,LOWER_UP>")
-            interface_match = re.match(r'^\d+:\s+([^:]+):', line)
+            interface_match = _INTERFACE_RE.match(line)
             if interface_match:
                 current_interface = interface_match.group(1).strip()
 
@@ -92,7 +201,7 @@ class PairedNTPAnalyzer:
 
             # 解析IP地址 (例如: "    inet 192.168.1.100/24 brd 192.168.1.255 scope global eth0")
             elif current_interface and 'inet ' in line:
-                ip_match = re.search(r'inet\s+(\d+\.\d+\.\d+\.\d+)/(\d+)', line)
+                ip_match = _INET_RE.search(line)
                 if ip_match:
                     ip_addr = ip_match.group(1)
                     prefix = ip_match.group(2)
@@ -102,56 +211,63 @@ class PairedNTPAnalyzer:
                         'network': self.calculate_network(ip_addr, int(prefix))
                     })
 
-    def calculate_network(self, ip_addr, prefix_len):
-        """计算网络地址"""
-        try:
-            ip_parts = [int(x) for x in ip_addr.split('.')]
-            mask = (0xFFFFFFFF << (32 - prefix_len)) & 0xFFFFFFFF
+        self.build_interface_networks()
+
+    def build_interface_networks(self):
+        """根据网卡信息构建最长前缀匹配使用的网段列表，网段的整数形式只在此处计算一次"""
+        networks = []
+        for interface_name, interface_info in self.interface_cache.items():
+            for addr_info in interface_info['ip_addresses']:
+                try:
+                    prefix_len = int(addr_info['prefix'])
+                    network_int, mask = self.calculate_network_int(addr_info['ip'], prefix_len)
+                except:
+                    continue
+                iface_info = {
+                    'interface': interface_name,
+                    'local_ip': addr_info['ip'],
+                    'network': addr_info['network']
+                }
+                networks.append((prefix_len, network_int, mask, iface_info))
 
-            ip_int = (ip_parts[0] << 24) + (ip_parts[1] << 16) + (ip_parts[2] << 8) + ip_parts[3]
-            network_int = ip_int & mask
+        # 前缀越长的网段越具体，排在前面优先匹配；排序稳定，前缀相同时保持网卡顺序
+        networks.sort(key=lambda entry: entry[0], reverse=True)
+        self.interface_networks = networks
+        self.determine_interface_for_ip.cache_clear()
 
-            network_parts = [
-                (network_int >> 24) & 0xFF,
-                (network_int >> 16) & 0xFF,
-                (network_int >> 8) & 0xFF,
-                network_int & 0xFF
-            ]
+    @staticmethod
+    def calculate_network_int(ip_addr, prefix_len):
+        """
+        计算网络地址的整数形式
 
-            return f"{'.'.join(map(str, network_parts))}/{prefix_len}"
+        Returns:
+            (network_int, mask): 网络地址和子网掩码（32位整数）
+        """
+        mask = (0xFFFFFFFF << (32 - prefix_len)) & 0xFFFFFFFF
+        ip_int = _IPV4_INT.unpack(socket.inet_aton(ip_addr))[0]
+        return ip_int & mask, mask
+
+    def calculate_network(self, ip_addr, prefix_len):
+        """计算网络地址"""
+        try:
+            network_int, _ = self.calculate_network_int(ip_addr, prefix_len)
+            return f"{socket.inet_ntoa(_IPV4_INT.pack(network_int))}/{prefix_len}"
         except:
             return f"{ip_addr}/{prefix_len}"
 
-    def determine_interface_for_ip(self, ip_address):
-        """根据IP地址确定对应的网卡"""
+    def lookup_interface_for_ip(self, ip_address):
+        """根据IP地址确定对应的网卡（最长前缀匹配），不经缓存；数据包解析使用带缓存的determine_interface_for_ip"""
         try:
-            ip_parts = [int(x) for x in ip_address.split('.')]
-            ip_int = (ip_parts[0] << 24) + (ip_parts[1] << 16) + (ip_parts[2] << 8) + ip_parts[3]
+            ip_int = _IPV4_INT.unpack(socket.inet_aton(ip_address))[0]
 
-            for interface_name, interface_info in self.interface_cache.items():
-                for addr_info in interface_info['ip_addresses']:
-                    try:
-                        network_ip, prefix = addr_info['network'].split('/')
-                        prefix_len = int(prefix)
-
-                        network_parts = [int(x) for x in network_ip.split('.')]
-                        network_int = (network_parts[0] << 24) + (network_parts[1] << 16) + (network_parts[2] << 8) + \
-                                      network_parts[3]
-
-                        mask = (0xFFFFFFFF << (32 - prefix_len)) & 0xFFFFFFFF
-
-                        if (ip_int & mask) == network_int:
-                            return {
-                                'interface': interface_name,
-                                'local_ip': addr_info['ip'],
-                                'network': addr_info['network']
-                            }
-                    except:
-                        continue
-
-            return {'interface': 'unknown', 'local_ip': 'unknown', 'network': 'unknown'}
+            # 最长前缀匹配：网段按前缀长度降序排列，第一个匹配的即为最具体的网段
+            for _, network_int, mask, iface_info in self.interface_networks:
+                if (ip_int & mask) == network_int:
+                    return iface_info
+
+            return _UNKNOWN_IFACE
         except:
-            return {'interface': 'unknown', 'local_ip': 'unknown', 'network': 'unknown'}
+            return _UNKNOWN_IFACE
 
     def parse_packet(self, lines):
         """解析单个数据包"""
@@ -161,15 +277,14 @@ class PairedNTPAnalyzer:
         for line in lines:
             line = line.strip()
 
-            # 解析时间戳
-            timestamp_match = re.match(r'(\d+:\d+:\d+\.\d+)', line)
+            # 解析时间戳（tcpdump时间戳为HH:MM:SS.ffffff，先做字符检查再用正则确认）
+            timestamp_match = _TIMESTAMP_RE.match(line) if line[2:3] == ':' and line[:2].isdigit() else None
             if timestamp_match:
                 packet_info['timestamp'] = timestamp_match.group(1)
                 packet_info['capture_time'] = time.time()
 
             # 解析客户端请求
-            client_match = re.search(r'(\d+\.\d+\.\d+\.\d+)\.(\d+) > (\d+\.\d+\.\d+\.\d+)\.123: NTPv(\d+), Client',
-                                     line)
+            client_match = _CLIENT_RE.search(line) if ', Client' in line else None
             if client_match:
                 src_ip = client_match.group(1)
                 dst_ip = client_match.group(3)
@@ -190,8 +305,7 @@ class PairedNTPAnalyzer:
                 })
 
             # 解析服务器响应
-            server_match = re.search(r'(\d+\.\d+\.\d+\.\d+)\.123 > (\d+\.\d+\.\d+\.\d+)\.(\d+): NTPv(\d+), Server',
-                                     line)
+            server_match = _SERVER_RE.search(line) if ', Server' in line else None
             if server_match:
                 src_ip = server_match.group(1)
                 dst_ip = server_match.group(2)
@@ -218,66 +332,70 @@ class PairedNTPAnalyzer:
 
     def parse_ntp_fields(self, line, ntp_info):
         """解析NTP协议字段"""
+        # 每个字段的正则都包含固定的关键字，先用子串判断该行是否含有关键字，
+        # 只对可能匹配的行执行正则（每行通常只含其中一两个字段）
+
         # 数据长度
-        length_match = re.search(r'length (\d+)', line)
-        if length_match:
-            ntp_info['length'] = int(length_match.group(1))
+        if 'length ' in line:
+            length_match = _LENGTH_RE.search(line)
+            if length_match:
+                ntp_info['length'] = int(length_match.group(1))
 
         # 闰秒指示器
-        leap_match = re.search(r'Leap indicator: ([^,]+)', line)
-        if leap_match:
-            leap_text = leap_match.group(1).strip()
-            ntp_info['leap_indicator'] = leap_text
-            leap_num_match = re.search(r'\((\d+)\)', leap_text)
-            if leap_num_match:
-                ntp_info['leap_value'] = int(leap_num_match.group(1))
+        if 'Leap indicator: ' in line:
+            leap_match = _LEAP_RE.search(line)
+            if leap_match:
+                leap_text = leap_match.group(1).strip()
+                ntp_info['leap_indicator'] = leap_text
+                leap_num_match = _LEAP_VALUE_RE.search(leap_text)
+                if leap_num_match:
+                    ntp_info['leap_value'] = int(leap_num_match.group(1))
 
         # 层级
-        stratum_match = re.search(r'Stratum (\d+) \(([^)]+)\)', line)
-        if stratum_match:
-            ntp_info.update({
-                'stratum': int(stratum_match.group(1)),
-                'stratum_desc': stratum_match.group(2)
-            })
+        if 'Stratum ' in line:
+            stratum_match = _STRATUM_RE.search(line)
+            if stratum_match:
+                ntp_info.update({
+                    'stratum': int(stratum_match.group(1)),
+                    'stratum_desc': stratum_match.group(2)
+                })
 
         # 轮询间隔
-        poll_match = re.search(r'poll (\d+) \(([^)]+)\)', line)
-        if poll_match:
-            ntp_info.update({
-                'poll': int(poll_match.group(1)),
-                'poll_desc': poll_match.group(2)
-            })
+        if 'poll ' in line:
+            poll_match = _POLL_RE.search(line)
+            if poll_match:
+                ntp_info.update({
+                    'poll': int(poll_match.group(1)),
+                    'poll_desc': poll_match.group(2)
+                })
 
         # 精度
-        precision_match = re.search(r'precision (-?\d+)', line)
-        if precision_match:
-            ntp_info['precision'] = int(precision_match.group(1))
+        if 'precision ' in line:
+            precision_match = _PRECISION_RE.search(line)
+            if precision_match:
+                ntp_info['precision'] = int(precision_match.group(1))
 
         # 根延迟和根离散
-        root_match = re.search(r'Root Delay: ([0-9.]+), Root dispersion: ([0-9.]+)', line)
-        if root_match:
-            ntp_info.update({
-                'root_delay': float(root_match.group(1)),
-                'root_dispersion': float(root_match.group(2))
-            })
+        if 'Root Delay: ' in line:
+            root_match = _ROOT_RE.search(line)
+            if root_match:
+                ntp_info.update({
+                    'root_delay': float(root_match.group(1)),
+                    'root_dispersion': float(root_match.group(2))
+                })
 
         # 参考ID
-        ref_id_match = re.search(r'Reference-ID: ([^\s]+)', line)
-        if ref_id_match:
-            ntp_info['reference_id'] = ref_id_match.group(1)
+        if 'Reference-ID: ' in line:
+            ref_id_match = _REFERENCE_ID_RE.search(line)
+            if ref_id_match:
+                ntp_info['reference_id'] = ref_id_match.group(1)
 
         # 时间戳
-        timestamps = {
-            'reference': r'Reference Timestamp:\s+([0-9.]+)',
-            'originate': r'Originator Timestamp: ([0-9.]+)',
-            'receive': r'Receive Timestamp:\s+([0-9.]+)',
-            'transmit': r'Transmit Timestamp:\s+([0-9.]+)'
-        }
-
-        for ts_name, pattern in timestamps.items():
-            ts_match = re.search(pattern, line)
-            if ts_match:
-                ntp_info[f'{ts_name}_timestamp'] = float(ts_match.group(1))
+        if 'Timestamp:' in line:
+            for ts_key, pattern in _NTP_TIMESTAMP_RES:
+                ts_match = pattern.search(line)
+                if ts_match:
+                    ntp_info[ts_key] = float(ts_match.group(1))
 
     def get_session_key(self, packet_info):
         """生成会话键"""
@@ -292,16 +410,18 @@ class PairedNTPAnalyzer:
 
         if packet_info['packet_type'] == 'request':
             # 存储请求，等待响应
-            self.pending_requests[session_key] = {
+            self.pending_requests[session_key] = (time.monotonic(), {
                 'packet_info': packet_info,
                 'ntp_info': ntp_info,
                 'timestamp': time.time()
-            }
+            })
+            # 同一会话重发的请求移到末尾，保持按时间排序
+            self.pending_requests.move_to_end(session_key)
 
         elif packet_info['packet_type'] == 'response':
             # 查找对应的请求
             if session_key in self.pending_requests:
-                request_data = self.pending_requests.pop(session_key)
+                _, request_data = self.pending_requests.pop(session_key)
 
                 # 创建完整的会话记录
                 session = {
@@ -315,11 +435,15 @@ class PairedNTPAnalyzer:
                 }
 
                 self.session_count += 1
-                self.completed_sessions.append(session)
+                if self.sessions_file:
+                    self.completed_sessions.append(session)
+                    if len(self.completed_sessions) >= SESSION_FLUSH_SIZE:
+                        self.flush_sessions()
                 self.display_paired_session(session)
 
             else:
                 # 没有找到对应的请求，记录为未匹配
+                self.unmatched_count += 1
                 self.unmatched_packets.append({
                     'type': 'orphaned_response',
                     'packet_info': packet_info,
@@ -327,74 +451,77 @@ class PairedNTPAnalyzer:
                 })
 
     def display_paired_session(self, session):
-        """显示配对的NTP会话"""
+        """显示配对的NTP会话，整段输出拼好后一次性写入stdout"""
+        lines = []
         req = session['request']
         resp = session['response']
 
-        print("\n" + "=" * 95)
-        print(f"🔄 NTP会话 #{session['session_id']} - 完整交互流程")
-        print("=" * 95)
+        lines.append("\n" + "=" * 95)
+        lines.append(f"🔄 NTP会话 #{session['session_id']} - 完整交互流程")
+        lines.append("=" * 95)
 
         # 会话概览
         req_info = req['packet_info']
         resp_info = resp['packet_info']
 
-        print("📋 会话概览:")
-        print(f"  ├─ 客户端: {req_info['src_ip']}:{req_info['src_port']}")
-        print(f"  ├─ 服务器: {req_info['dst_ip']}:{req_info['dst_port']}")
-        print(f"  ├─ NTP版本: v{req_info['ntp_version']}")
-        print(f"  └─ 数据长度: {req['ntp_info'].get('length', 48)} bytes")
+        lines.append("📋 会话概览:")
+        lines.append(f"  ├─ 客户端: {req_info['src_ip']}:{req_info['src_port']}")
+        lines.append(f"  ├─ 服务器: {req_info['dst_ip']}:{req_info['dst_port']}")
+        lines.append(f"  ├─ NTP版本: v{req_info['ntp_version']}")
+        lines.append(f"  └─ 数据长度: {req['ntp_info'].get('length', 48)} bytes")
 
         # 网卡信息 - 只显示服务器网卡
         server_if = req_info.get('dst_interface_info', {})
-        print(f"  └─ 服务器网卡: {server_if.get('interface', 'unknown')}")
+        lines.append(f"  └─ 服务器网卡: {server_if.get('interface', 'unknown')}")
 
         # 客户端请求详情
-        print(f"\n📤 客户端请求 ({req_info['timestamp']}):")
-        self.display_ntp_details(req['ntp_info'], "request")
+        lines.append(f"\n📤 客户端请求 ({req_info['timestamp']}):")
+        self.display_ntp_details(req['ntp_info'], "request", lines)
 
         # 服务器响应详情
-        print(f"\n📥 服务器响应 ({resp_info['timestamp']}):")
-        self.display_ntp_details(resp['ntp_info'], "response")
+        lines.append(f"\n📥 服务器响应 ({resp_info['timestamp']}):")
+        self.display_ntp_details(resp['ntp_info'], "response", lines)
 
         # 时间分析
-        self.display_timing_analysis(req['ntp_info'], resp['ntp_info'])
+        self.display_timing_analysis(req['ntp_info'], resp['ntp_info'], lines)
 
-        print("=" * 95)
+        lines.append("=" * 95)
 
-    def display_ntp_details(self, ntp_info, packet_type):
-        """显示NTP详细信息"""
+        sys.stdout.write('\n'.join(lines) + '\n')
+
+    def display_ntp_details(self, ntp_info, packet_type, lines):
+        """显示NTP详细信息，输出行追加到lines"""
         if 'leap_indicator' in ntp_info:
             leap_desc = self.get_leap_description(ntp_info.get('leap_value', -1))
-            print(f"  ├─ 闰秒指示器: {ntp_info['leap_indicator']} - {leap_desc}")
+            lines.append(f"  ├─ 闰秒指示器: {ntp_info['leap_indicator']} - {leap_desc}")
 
         if 'stratum' in ntp_info:
             stratum_desc = self.get_stratum_description(ntp_info['stratum'])
-            print(f"  ├─ 层级: {ntp_info['stratum']} ({stratum_desc})")
+            lines.append(f"  ├─ 层级: {ntp_info['stratum']} ({stratum_desc})")
 
         if 'poll' in ntp_info:
             poll_seconds = 2 ** ntp_info['poll']
-            print(f"  ├─ 轮询间隔: {ntp_info['poll']} (每 {poll_seconds} 秒)")
+            lines.append(f"  ├─ 轮询间隔: {ntp_info['poll']} (每 {poll_seconds} 秒)")
 
         if 'precision' in ntp_info:
             precision_val = 2 ** ntp_info['precision']
-            print(f"  ├─ 时钟精度: {ntp_info['precision']} (±{precision_val:.9f} 秒)")
+            lines.append(f"  ├─ 时钟精度: {ntp_info['precision']} (±{precision_val:.9f} 秒)")
 
         if 'root_delay' in ntp_info:
-            print(f"  ├─ 根延迟: {ntp_info['root_delay']:.6f} 秒")
+            lines.append(f"  ├─ 根延迟: {ntp_info['root_delay']:.6f} 秒")
 
         if 'root_dispersion' in ntp_info:
-            print(f"  ├─ 根离散: {ntp_info['root_dispersion']:.6f} 秒")
+            lines.append(f"  ├─ 根离散: {ntp_info['root_dispersion']:.6f} 秒")
 
         if 'reference_id' in ntp_info:
-            print(f"  └─ 参考标识: {ntp_info['reference_id']}")
+            lines.append(f"  └─ 参考标识: {ntp_info['reference_id']}")
 
         # 时间戳信息
-        self.display_timestamps(ntp_info, packet_type)
+        self.display_timestamps(ntp_info, packet_type, lines)
 
-    def display_timestamps(self, ntp_info, packet_type):
-        """显示时间戳信息"""
-        print(f"  🕐 时间戳信息 ({packet_type}):")
+    def display_timestamps(self, ntp_info, packet_type, lines):
+        """显示时间戳信息，输出行追加到lines"""
+        lines.append(f"  🕐 时间戳信息 ({packet_type}):")
 
         timestamp_labels = {
             'reference': '参考时间戳',
@@ -406,11 +533,11 @@ class PairedNTPAnalyzer:
         for ts_key, label in timestamp_labels.items():
             ts_value = ntp_info.get(f'{ts_key}_timestamp', 0)
             readable_time = self.ntp_timestamp_to_datetime(ts_value)
-            print(f"    ├─ {label}: {readable_time}")
+            lines.append(f"    ├─ {label}: {readable_time}")
 
-    def display_timing_analysis(self, req_ntp, resp_ntp):
-        """显示时间分析"""
-        print(f"\n⏱️  时间性能分析:")
+    def display_timing_analysis(self, req_ntp, resp_ntp, lines):
+        """显示时间分析，输出行追加到lines"""
+        lines.append(f"\n⏱️  时间性能分析:")
 
         # 获取关键时间戳
         t1 = req_ntp.get('transmit_timestamp', 0)  # 客户端发送时间
@@ -422,16 +549,16 @@ class PairedNTPAnalyzer:
             network_delay = t2 - t1  # 网络延迟（单向）
             server_processing = t3 - t2  # 服务器处理时间
 
-            print(f"  ├─ 网络传输延迟: {network_delay:.6f} 秒")
-            print(f"  ├─ 服务器处理时间: {server_processing:.6f} 秒")
-            print(f"  └─ 总响应时间: {(network_delay + server_processing):.6f} 秒")
+            lines.append(f"  ├─ 网络传输延迟: {network_delay:.6f} 秒")
+            lines.append(f"  ├─ 服务器处理时间: {server_processing:.6f} 秒")
+            lines.append(f"  └─ 总响应时间: {(network_delay + server_processing):.6f} 秒")
 
             # 时钟偏移估算（简化）
             if network_delay > 0:
                 estimated_offset = network_delay + (server_processing / 2)
-                print(f"  📊 估算时钟偏移: ±{estimated_offset:.6f} 秒")
+                lines.append(f"  📊 估算时钟偏移: ±{estimated_offset:.6f} 秒")
         else:
-            print(f"  ⚠️  时间戳信息不完整，无法计算详细时间分析")
+            lines.append(f"  ⚠️  时间戳信息不完整，无法计算详细时间分析")
 
     def get_leap_description(self, leap_value):
         """获取闰秒指示器描述"""
@@ -455,31 +582,27 @@ class PairedNTPAnalyzer:
 
     def ntp_timestamp_to_datetime(self, ntp_timestamp):
         """将NTP时间戳转换为可读时间"""
-        if ntp_timestamp == 0:
-            return "未设置"
-        try:
-            unix_timestamp = ntp_timestamp - 2208988800
-            dt = datetime.fromtimestamp(unix_timestamp, tz=timezone.utc)
-            return dt.strftime('%Y-%m-%d %H:%M:%S.%f UTC')[:-3]
-        except (ValueError, OSError):
-            return f"解析错误: {ntp_timestamp}"
+        return _format_ntp_timestamp(ntp_timestamp)
 
     def cleanup_old_requests(self):
         """清理超时的请求"""
-        current_time = time.time()
-        expired_keys = []
-
-        for key, request_data in self.pending_requests.items():
-            if current_time - request_data['timestamp'] > self.pairing_timeout:
-                expired_keys.append(key)
-                self.unmatched_packets.append({
-                    'type': 'orphaned_request',
-                    'packet_info': request_data['packet_info'],
-                    'ntp_info': request_data['ntp_info']
-                })
-
-        for key in expired_keys:
-            del self.pending_requests[key]
+        current_time = time.monotonic()
+        pending_requests = self.pending_requests
+
+        # 请求按到达时间排序，从最早的开始清理，遇到未超时的请求即可停止；
+        # 到达时间取单调时钟，系统时间被向回调整时队首请求也不会阻塞后面请求的清理
+        while pending_requests:
+            received_at, request_data = next(iter(pending_requests.values()))
+            if current_time - received_at <= self.pairing_timeout:
+                break
+
+            pending_requests.popitem(last=False)
+            self.unmatched_count += 1
+            self.unmatched_packets.append({
+                'type': 'orphaned_request',
+                'packet_info': request_data['packet_info'],
+                'ntp_info': request_data['ntp_info']
+            })
 
     def process_packet_block(self, lines):
         """处理数据包块"""
@@ -516,8 +639,8 @@ class PairedNTPAnalyzer:
                 if not line:
                     continue
 
-                # 检测新数据包开始
-                if re.match(r'\d+:\d+:\d+\.\d+', line):
+                # 检测新数据包开始：以HH:时间戳开头的行，绝大多数续行在字符检查处即被排除
+                if line[2:3] == ':' and line[:2].isdigit() and _TIMESTAMP_RE.match(line):
                     if current_block:
                         self.process_packet_block(current_block)
                     current_block = [line]
@@ -534,27 +657,39 @@ class PairedNTPAnalyzer:
             if 'process' in locals():
                 process.terminate()
 
+    def flush_sessions(self):
+        """将累积的已完成会话追加写入会话文件并释放"""
+        if self._sessions_fh is None:
+            self._sessions_fh = open(self.sessions_file, 'wb')
+        if self.completed_sessions:
+            self._sessions_fh.write(b''.join(_dump_json_line(session) for session in self.completed_sessions))
+            self.completed_sessions.clear()
+
     def save_results(self):
-        """保存结果"""
+        """保存结果 - 会话数据已逐条写入会话文件，输出文件只保存摘要"""
         if self.output_file:
             try:
+                self.flush_sessions()
+                self._sessions_fh.close()
+                self._sessions_fh = None
+
                 summary = {
                     'capture_summary': {
                         'total_packets': self.packet_count,
-                        'completed_sessions': len(self.completed_sessions),
+                        'completed_sessions': self.session_count,
                         'pending_requests': len(self.pending_requests),
-                        'unmatched_packets': len(self.unmatched_packets),
+                        'unmatched_packets': self.unmatched_count,
                         'capture_time': datetime.now().isoformat()
                     },
                     'interface_info': self.interface_cache,
-                    'sessions': self.completed_sessions,
-                    'unmatched_packets': self.unmatched_packets
+                    'sessions_file': self.sessions_file,
+                    'unmatched_packets': list(self.unmatched_packets)
                 }
 
-                with open(self.output_file, 'w', encoding='utf-8') as f:
-                    json.dump(summary, f, indent=2, ensure_ascii=False)
+                with open(self.output_file, 'wb') as f:
+                    f.write(_dump_json_document(summary))
 
-                print(f"\n💾 结果已保存到: {self.output_file}")
+                print(f"\n💾 结果已保存到: {self.output_file}（会话数据: {self.sessions_file}）")
             except Exception as e:
                 print(f"❌ 保存失败: {e}")
 
@@ -581,6 +716,7 @@ class PairedNTPAnalyzer:
         print(f"⏱️  配对超时: {self.pairing_timeout} 秒")
         if self.output_file:
             print(f"💾 输出文件: {self.output_file}")
+            print(f"💾 会话文件: {self.sessions_file}")
 
         # 显示网卡信息
         self.display_interface_summary()
@@ -594,9 +730,9 @@ class PairedNTPAnalyzer:
         def signal_handler(sig, frame):
             print(f"\n\n📊 捕获统计:")
             print(f"  总数据包: {self.packet_count}")
-            print(f"  完整会话: {len(self.completed_sessions)}")
+            print(f"  完整会话: {self.session_count}")
             print(f"  待配对请求: {len(self.pending_requests)}")
-            print(f"  未匹配数据包: {len(self.unmatched_packets)}")
+            print(f"  未匹配数据包: {self.unmatched_count}")
             self.save_results()
             print("🛑 监听已停止")
             sys.exit(0)
@@ -620,7 +756,7 @@ def main():
     parser.add_argument('-p', '--port', type=int, default=123,
                         help='NTP端口 (默认: 123)')
     parser.add_argument('-o', '--output',
-                        help='保存结果到JSON文件')
+                        help='保存结果摘要到JSON文件，会话数据逐条写入同名.jsonl文件')
     parser.add_argument('-t', '--timeout', type=float, default=2.0,
                         help='配对超时时间（秒，默认: 2.0）')
 
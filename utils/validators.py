@@ -1,7 +1,10 @@
+import functools
 import ipaddress
-import re
 from typing import List, Dict, Any, Union, Optional
 
+# Number of distinct addresses / routes whose validation result is remembered
+VALIDATION_CACHE_SIZE = 1024
+
 
 def validate_ip_address(ip: str) -> bool:
     """
@@ -13,6 +16,33 @@ def validate_ip_address(ip: str) -> bool:
     Returns:
         bool: True if valid, False otherwise
     """
+    return _parse_ip_network(ip) is not None
+
+
+def _parse_ip_network(ip: str) -> Optional[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+    """
+    Parse an IP address with optional CIDR notation.
+
+    Parsed networks are cached per address, since the same addresses are validated on every
+    configuration request. The family-specific validators check the type of the returned
+    network instead of inspecting or parsing the string again.
+
+    Args:
+        ip: IP address string potentially with CIDR notation
+
+    Returns:
+        Optional[Union[IPv4Network, IPv6Network]]: The parsed network, None if the address is invalid
+    """
+    try:
+        return _parse_ip_network_cached(ip)
+    except TypeError:
+        # Unhashable values (e.g. a list from malformed JSON) cannot be cached and are never valid
+        return None
+
+
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def _parse_ip_network_cached(ip: str) -> Optional[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+    """Uncached implementation of _parse_ip_network."""
     try:
         # If CIDR notation is not included, add a default one for validation
         if '/' not in ip:
@@ -20,10 +50,35 @@ def validate_ip_address(ip: str) -> bool:
         else:
             test_ip = ip
 
-        ipaddress.ip_network(test_ip, strict=False)
-        return True
+        return ipaddress.ip_network(test_ip, strict=False)
     except (ValueError, TypeError):
-        return False
+        return None
+
+
+def validate_ipv4_address(ip: str) -> bool:
+    """
+    Validate if the given string is a valid IPv4 address with optional CIDR notation.
+
+    Args:
+        ip: IPv4 address string potentially with CIDR notation (e.g., "192.168.1.1/24")
+
+    Returns:
+        bool: True if valid, False otherwise
+    """
+    return isinstance(_parse_ip_network(ip), ipaddress.IPv4Network)
+
+
+def validate_ipv6_address(ip: str) -> bool:
+    """
+    Validate if the given string is a valid IPv6 address with optional CIDR notation.
+
+    Args:
+        ip: IPv6 address string potentially with CIDR notation (e.g., "2001:db8::1/64")
+
+    Returns:
+        bool: True if valid, False otherwise
+    """
+    return isinstance(_parse_ip_network(ip), ipaddress.IPv6Network)
 
 
 def validate_route(route: Dict[str, str]) -> bool:
@@ -42,15 +97,33 @@ def validate_route(route: Dict[str, str]) -> bool:
     if 'destination' not in route or 'gateway' not in route:
         return False
 
+    try:
+        return _validate_route_addresses(route['destination'], route['gateway'])
+    except TypeError:
+        # Unhashable values cannot be cached and are never valid addresses
+        return False
+
+
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def _validate_route_addresses(destination: str, gateway: str) -> bool:
+    """
+    Validate a route's destination and gateway; cached per (destination, gateway) pair.
+
+    Args:
+        destination: Route destination network
+        gateway: Route gateway address
+
+    Returns:
+        bool: True if valid, False otherwise
+    """
     # Destination should be a valid network (with CIDR)
     try:
-        ipaddress.ip_network(route['destination'])
+        ipaddress.ip_network(destination)
     except (ValueError, TypeError):
         return False
 
     # Gateway should be a valid IP address (without CIDR)
     try:
-        gateway = route['gateway']
         if '/' in gateway:
             return False
         ipaddress.ip_address(gateway)
@@ -78,23 +151,23 @@ def validate_network_config(config: Dict[str, Any]) -> Union[List[str], bool]:
     # Validate IPv4 addresses
     if 'ipv4_addresses' in config and config['ipv4_addresses']:
         for addr in config['ipv4_addresses']:
-            if not validate_ip_address(addr) or ':' in addr:  # Ensure it's IPv4
+            if not validate_ipv4_address(addr):
                 errors.append(f"Invalid IPv4 address format: {addr}")
 
     # Validate IPv6 addresses
     if 'ipv6_addresses' in config and config['ipv6_addresses']:
         for addr in config['ipv6_addresses']:
-            if not validate_ip_address(addr) or ':' not in addr:  # Ensure it's IPv6
+            if not validate_ipv6_address(addr):
                 errors.append(f"Invalid IPv6 address format: {addr}")
 
     # Validate IPv4 gateway
     if 'ipv4_gateway' in config and config['ipv4_gateway']:
-        if not validate_ip_address(config['ipv4_gateway']) or ':' in config['ipv4_gateway']:
+        if not validate_ipv4_address(config['ipv4_gateway']):
             errors.append(f"Invalid IPv4 gateway format: {config['ipv4_gateway']}")
 
     # Validate IPv6 gateway
     if 'ipv6_gateway' in config and config['ipv6_gateway']:
-        if not validate_ip_address(config['ipv6_gateway']) or ':' not in config['ipv6_gateway']:
+        if not validate_ipv6_address(config['ipv6_gateway']):
             errors.append(f"Invalid IPv6 gateway format: {config['ipv6_gateway']}")
 
     # Validate DNS servers